@@ -0,0 +1,54 @@
+"""Periodic jobs run by a daemon thread inside the web process.
+
+A job's thread is started by the first request that needs it rather than
+at import, so management commands, migrations and the test runner never
+start one. Each process that serves such a request runs its own copy.
+Jobs whose interval setting is 0 never start; a management command run
+from cron does their work instead.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """Call `fn()` every `settings.<interval_setting>` seconds, and `at_exit()`
+    when the process exits if given, once `ensure_started()` has been called."""
+
+    def __init__(self, name, fn, interval_setting, at_exit=None):
+        self.name = name
+        self.fn = fn
+        self.interval_setting = interval_setting
+        self.at_exit = at_exit
+        self._lock = threading.Lock()
+        self._started = False
+
+    def _interval(self):
+        return getattr(settings, self.interval_setting)
+
+    def _run(self):
+        while True:
+            time.sleep(self._interval())
+            try:
+                self.fn()
+            except Exception:
+                logger.exception("Background job %s failed.", self.name)
+            finally:
+                close_old_connections()
+
+    def ensure_started(self):
+        if self._started or not self._interval():
+            return
+        with self._lock:
+            if self._started:
+                return
+            threading.Thread(target=self._run, name=self.name, daemon=True).start()
+            if self.at_exit is not None:
+                atexit.register(self.at_exit)
+            self._started = True
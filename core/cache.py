@@ -0,0 +1,115 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .utils import get_lang_from_path
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock rather than 1 so an evicted version key never
+        # comes back equal to a value that older entries were stored under.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    get_version(key)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def reviews_version_key(event_id):
+    """Bumped whenever a review of the event is saved or deleted."""
+    return f'reviews:version:{event_id}'
+
+
+def get_catalog_version():
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version(**kwargs):
+    """Signal receiver: marks every cached catalog response as stale."""
+    bump_version(CATALOG_VERSION_KEY)
+
+
+def _catalog_key(request):
+    query = '&'.join(
+        f"{key}={value}"
+        for key, values in sorted(request.GET.lists())
+        for value in sorted(values)
+    )
+    digest = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+    return f"catalog:{get_lang_from_path(request)}:{digest}"
+
+
+def _wait_for_entry(key, version):
+    deadline = time.time() + settings.CATALOG_CACHE_LOCK_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None and entry['version'] == version:
+            return entry
+    return None
+
+
+def cached_catalog_response(request, build_response):
+    """Serve a public catalog response from the cache.
+
+    Entries carry the catalog version they were built under and a freshness
+    deadline. A fresh entry from the current version is returned as-is. For a
+    stale entry (expired, or built before the last model change) only the
+    request that wins the rebuild lock queries the database; everyone else
+    keeps getting the stale copy until the rebuilt one lands. On a cold miss
+    the losers wait briefly for the winner instead of all hitting MySQL.
+    """
+    key = _catalog_key(request)
+    lock_key = f"{key}:lock"
+    version = get_catalog_version()
+    entry = cache.get(key)
+    now = time.time()
+
+    if entry is not None and entry['version'] == version and entry['fresh_until'] > now:
+        return Response(entry['data'], status=entry['status'])
+
+    locked = cache.add(lock_key, 1, timeout=settings.CATALOG_CACHE_LOCK_TIMEOUT)
+    if not locked:
+        if entry is None:
+            entry = _wait_for_entry(key, version)
+        if entry is not None:
+            return Response(entry['data'], status=entry['status'])
+
+    try:
+        response = build_response()
+        if response.status_code == 200:
+            cache.set(key, {
+                'version': version,
+                'fresh_until': now + settings.CATALOG_CACHE_TIMEOUT,
+                'data': response.data,
+                'status': response.status_code,
+            }, timeout=settings.CATALOG_CACHE_TIMEOUT + settings.CATALOG_CACHE_STALE_TIMEOUT)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return response
+
+
+class CachedCatalogMixin:
+    """Caches GET responses of public catalog views; see cached_catalog_response."""
+
+    def get(self, request, *args, **kwargs):
+        return cached_catalog_response(
+            request,
+            lambda: super(CachedCatalogMixin, self).get(request, *args, **kwargs),
+        )
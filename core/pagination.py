@@ -0,0 +1,21 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Keyset pagination over `-created_at` (or the OrderingFilter field the
+    client picked). Cursors encode the last seen value rather than an offset,
+    so rows inserted while a client is paging never shift or repeat items."""
+    ordering = '-created_at'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        # Break ties on ascending pk: rows sharing a sort value (equal prices,
+        # same-second inserts) keep one deterministic order, and new rows land
+        # at the end of their tie group so the cursor's in-group offset stays
+        # valid across inserts.
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            ordering += ('pk',)
+        return ordering
@@ -0,0 +1,271 @@
+"""Opt-in per-endpoint request profiling (REQUEST_PROFILING).
+
+QueryProfilingMiddleware records, for every request, the number of SQL
+queries and their total time, the time spent building serializer `.data`,
+the total time and the response size. Requests are aggregated per
+endpoint (`<app>:<url name>`, e.g. `customer:event-list`) into fixed-bucket
+histograms in process memory. Each process publishes its histograms to the
+cache every PROFILING_PUBLISH_INTERVAL seconds, so the admin endpoint and
+`manage.py profiling_report` can merge all of them.
+
+QUERY_BUDGETS maps endpoints to a maximum query count (QUERY_BUDGET_DEFAULT
+applies to the rest, 0 meaning none). Going over is logged, counted, and
+with QUERY_BUDGET_STRICT raises QueryBudgetExceeded, which fails the test
+that made the request.
+"""
+import bisect
+import contextvars
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'profiling'
+GENERATION_KEY = f'{KEY_PREFIX}:generation'
+SNAPSHOT_TTL = 24 * 60 * 60
+
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+METRICS = ('queries', 'sql_ms', 'serializer_ms', 'total_ms', 'bytes')
+
+_current = contextvars.ContextVar('request_profile', default=None)
+_stats = {}
+_stats_lock = threading.Lock()
+_published_at = 0.0
+_generation = None
+_slot = None
+_ident = f"{socket.gethostname()}:{os.getpid()}"
+_timer_installed = False
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class _Probe:
+    """Per-request counters; also the execute_wrapper around every query."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_seconds += time.perf_counter() - started
+
+
+def _install_serializer_timer():
+    """Time the outermost `.data` of each serializer tree; nested ones are
+    part of their parent's time."""
+    global _timer_installed
+    if _timer_installed:
+        return
+    original = BaseSerializer.data.fget
+
+    def data(self):
+        probe = _current.get()
+        if probe is None or probe.serializer_depth:
+            return original(self)
+        probe.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            probe.serializer_seconds += time.perf_counter() - started
+            probe.serializer_depth -= 1
+
+    BaseSerializer.data = property(data)
+    _timer_installed = True
+
+
+def _empty_entry():
+    entry = {'requests': 0, 'over_budget': 0}
+    for metric in METRICS:
+        entry[f'{metric}_sum'] = 0
+        entry[f'{metric}_max'] = 0
+    entry['queries_hist'] = [0] * (len(QUERY_BUCKETS) + 1)
+    entry['total_ms_hist'] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    return entry
+
+
+def _record(endpoint, sample, over_budget):
+    with _stats_lock:
+        entry = _stats.get(endpoint)
+        if entry is None:
+            entry = _stats[endpoint] = _empty_entry()
+        entry['requests'] += 1
+        entry['over_budget'] += over_budget
+        for metric in METRICS:
+            entry[f'{metric}_sum'] += sample[metric]
+            entry[f'{metric}_max'] = max(entry[f'{metric}_max'], sample[metric])
+        entry['queries_hist'][bisect.bisect_left(QUERY_BUCKETS, sample['queries'])] += 1
+        entry['total_ms_hist'][bisect.bisect_left(LATENCY_BUCKETS_MS, sample['total_ms'])] += 1
+
+
+def _snapshot_key(ident):
+    return f'{KEY_PREFIX}:proc:{ident}'
+
+
+def _register():
+    # Same slot scheme as services/view_counts.py: readers find every
+    # process's snapshot without scanning the cache.
+    global _slot
+    size_key = f'{KEY_PREFIX}:procs:n'
+    if cache.add(size_key, 1, timeout=None):
+        _slot = 1
+    else:
+        _slot = cache.incr(size_key)
+    cache.set(f'{KEY_PREFIX}:procs:{_slot}', _ident, timeout=None)
+
+
+def publish(force=False):
+    """Copy this process's histograms to the cache, at most once per interval."""
+    global _published_at, _generation
+    now = time.monotonic()
+    if not force and now - _published_at < settings.PROFILING_PUBLISH_INTERVAL:
+        return
+    _published_at = now
+    generation = cache.get(GENERATION_KEY, 0)
+    with _stats_lock:
+        if generation != _generation:
+            # reset_stats() was called somewhere since the last publish.
+            _stats.clear()
+            _generation = generation
+        snapshot = {endpoint: dict(entry, queries_hist=list(entry['queries_hist']),
+                                   total_ms_hist=list(entry['total_ms_hist']))
+                    for endpoint, entry in _stats.items()}
+    if _slot is None:
+        _register()
+    cache.set(_snapshot_key(_ident), {'generation': generation, 'stats': snapshot}, timeout=SNAPSHOT_TTL)
+
+
+def reset_stats():
+    """Drop the histograms of every process (applied at their next publish)."""
+    if not cache.add(GENERATION_KEY, 1, timeout=None):
+        cache.incr(GENERATION_KEY)
+
+
+def _percentile(hist, bounds, fraction):
+    total = sum(hist)
+    if not total:
+        return 0
+    seen = 0
+    for index, count in enumerate(hist):
+        seen += count
+        if seen >= total * fraction:
+            # Upper bound of the bucket; the overflow bucket reports the last bound.
+            return bounds[min(index, len(bounds) - 1)]
+    return bounds[-1]
+
+
+def collect_stats():
+    """Merged histograms of every publishing process, summarised per endpoint."""
+    if _stats:
+        publish(force=True)
+    size = cache.get(f'{KEY_PREFIX}:procs:n') or 0
+    idents = cache.get_many([f'{KEY_PREFIX}:procs:{slot}' for slot in range(1, size + 1)]).values()
+    generation = cache.get(GENERATION_KEY, 0)
+    merged = {}
+    for snapshot in cache.get_many([_snapshot_key(ident) for ident in set(idents)]).values():
+        if snapshot['generation'] != generation:
+            continue
+        for endpoint, entry in snapshot['stats'].items():
+            target = merged.setdefault(endpoint, _empty_entry())
+            for key, value in entry.items():
+                if key.endswith('_max'):
+                    target[key] = max(target[key], value)
+                elif key.endswith('_hist'):
+                    target[key] = [a + b for a, b in zip(target[key], value)]
+                else:
+                    target[key] += value
+
+    report = {}
+    for endpoint, entry in merged.items():
+        requests = entry['requests']
+        summary = {'requests': requests, 'over_budget': entry['over_budget'], 'budget': query_budget(endpoint)}
+        for metric in METRICS:
+            summary[f'{metric}_avg'] = round(entry[f'{metric}_sum'] / requests, 2)
+            summary[f'{metric}_max'] = round(entry[f'{metric}_max'], 2)
+        # Bucket bounds overstate small samples; never report above the max.
+        summary['queries_p95'] = min(_percentile(entry['queries_hist'], QUERY_BUCKETS, 0.95),
+                                     summary['queries_max'])
+        for fraction, name in ((0.5, 'total_ms_p50'), (0.95, 'total_ms_p95')):
+            summary[name] = min(_percentile(entry['total_ms_hist'], LATENCY_BUCKETS_MS, fraction),
+                                summary['total_ms_max'])
+        report[endpoint] = summary
+    return report
+
+
+def query_budget(endpoint):
+    return settings.QUERY_BUDGETS.get(endpoint, settings.QUERY_BUDGET_DEFAULT) or None
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    # URL names repeat across the panel/staff/customer apps ("login").
+    app = match.func.__module__.split('.')[0]
+    return f"{app}:{match.url_name or match.route}"
+
+
+class QueryProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        _install_serializer_timer()
+
+    def __call__(self, request):
+        probe = _Probe()
+        token = _current.set(probe)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(probe))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        endpoint = endpoint_name(request)
+        sample = {
+            'queries': probe.queries,
+            'sql_ms': probe.sql_seconds * 1000,
+            'serializer_ms': probe.serializer_seconds * 1000,
+            'total_ms': total * 1000,
+            'bytes': 0 if response.streaming else len(response.content),
+        }
+        budget = query_budget(endpoint)
+        over_budget = budget is not None and probe.queries > budget
+        _record(endpoint, sample, over_budget)
+        publish()
+
+        response['X-Query-Count'] = str(probe.queries)
+        response['Server-Timing'] = (
+            f"sql;dur={sample['sql_ms']:.1f}, serializer;dur={sample['serializer_ms']:.1f}, "
+            f"total;dur={sample['total_ms']:.1f}"
+        )
+        if over_budget:
+            message = f"{endpoint} ran {probe.queries} queries, over its budget of {budget}."
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -114,6 +114,7 @@ INSTALLED_APPS = [
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 MIDDLEWARE = [
+    'core.profiling.QueryProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', 
@@ -218,6 +219,98 @@ DATABASES = {
     }
 }
 
+# Local-memory cache by default. Set REDIS_URL (e.g. redis://127.0.0.1:6379/1,
+# needs the `redis` package) when running more than one worker process so
+# cache invalidation is shared between them.
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'funfinder',
+        }
+    }
+
+# Public catalog responses (core/cache.py): served fresh for
+# CATALOG_CACHE_TIMEOUT seconds, then served stale for up to
+# CATALOG_CACHE_STALE_TIMEOUT more while a single request rebuilds them.
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=300, cast=int)
+CATALOG_CACHE_STALE_TIMEOUT = config('CATALOG_CACHE_STALE_TIMEOUT', default=3600, cast=int)
+CATALOG_CACHE_LOCK_TIMEOUT = 10
+
+# Event detail views are buffered in the cache and written to
+# Event.views_count in bulk every interval (services/view_counts.py).
+EVENT_VIEWS_FLUSH_INTERVAL = config('EVENT_VIEWS_FLUSH_INTERVAL', default=10, cast=int)
+
+# Resolved sessions and their principals are cached by the session
+# middlewares (core/sessions.py) for at most this many seconds. Off unless
+# the cache is shared: with a local-memory cache, a logout or staff change
+# handled by one worker would not evict the entry held by the others.
+SESSION_AUTH_CACHE_TIMEOUT = config('SESSION_AUTH_CACHE_TIMEOUT', default=300 if REDIS_URL else 0, cast=int)
+
+# Each worker keeps a copy of the IP blacklist (customer/blacklist.py) and
+# reloads it when a BlackList change bumps the shared version key. With a
+# local-memory cache only the worker that handled the change sees the bump,
+# so the others also reload their copy once it is this many seconds old: a
+# blacklisted address is turned away everywhere within that time. 0 reloads
+# on version changes only, which is enough when the cache is shared.
+BLACKLIST_MAX_AGE = config('BLACKLIST_MAX_AGE', default=0 if REDIS_URL else 10, cast=int)
+
+# Expired customer/staff/admin sessions are deleted in batches by
+# `manage.py sweep_sessions`, and by an in-process thread every
+# SESSION_SWEEP_INTERVAL seconds when it is non-zero. Only the newest
+# SESSION_MAX_PER_PRINCIPAL sessions of each user are kept: older ones are
+# dropped at login, and by the sweep as a backstop.
+SESSION_SWEEP_INTERVAL = config('SESSION_SWEEP_INTERVAL', default=0, cast=int)
+SESSION_SWEEP_BATCH_SIZE = config('SESSION_SWEEP_BATCH_SIZE', default=1000, cast=int)
+SESSION_MAX_PER_PRINCIPAL = config('SESSION_MAX_PER_PRINCIPAL', default=10, cast=int)
+
+# Seats an unpaid order holds in its event slot (orders/capacity.py): for
+# SEAT_HOLD_TTL seconds from checkout, extended to SEAT_HOLD_PAYMENT_TTL
+# when payment starts. Lapsed holds are released by `manage.py
+# release_seat_holds` (run it from cron), and by an in-process thread every
+# SEAT_HOLD_SWEEP_INTERVAL seconds when it is non-zero. A checkout that
+# finds its slot full releases that slot's lapsed holds itself.
+SEAT_HOLD_TTL = config('SEAT_HOLD_TTL', default=15 * 60, cast=int)
+SEAT_HOLD_PAYMENT_TTL = config('SEAT_HOLD_PAYMENT_TTL', default=30 * 60, cast=int)
+SEAT_HOLD_SWEEP_INTERVAL = config('SEAT_HOLD_SWEEP_INTERVAL', default=0, cast=int)
+SEAT_HOLD_SWEEP_BATCH_SIZE = config('SEAT_HOLD_SWEEP_BATCH_SIZE', default=500, cast=int)
+
+# Responses to order/payment creation sent with an Idempotency-Key header
+# are replayed to retries with the same key for this many seconds
+# (orders/idempotency.py); `manage.py purge_idempotency_keys` drops older ones.
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=24 * 60 * 60, cast=int)
+
+# Uploaded images are stored as received and transcoded to WEBP by a pool of
+# IMAGE_TRANSCODE_WORKERS processes (services/images.py), or in the saving
+# process when it is 0; then only uploads and `manage.py transcode_images
+# --variants` make responsive variants, never a serializer. Each worker may
+# use IMAGE_TRANSCODE_MEMORY_MB of address space and decodes at most
+# IMAGE_MAX_PIXELS pixels; larger JPEGs are decoded at a reduced scale,
+# anything else larger is marked failed.
+IMAGE_TRANSCODE_WORKERS = config('IMAGE_TRANSCODE_WORKERS', default=2, cast=int)
+IMAGE_TRANSCODE_MEMORY_MB = config('IMAGE_TRANSCODE_MEMORY_MB', default=1024, cast=int)
+IMAGE_MAX_PIXELS = config('IMAGE_MAX_PIXELS', default=50_000_000, cast=int)
+
+# Per-endpoint query count, SQL/serializer time and response size
+# histograms (core/profiling.py). Off unless REQUEST_PROFILING is set; read
+# them at /api/v1/auth/profiling or with `manage.py profiling_report`.
+# QUERY_BUDGETS caps queries per endpoint ("customer:event-list": 8);
+# QUERY_BUDGET_STRICT turns overruns into errors, e.g. under tests.
+REQUEST_PROFILING = config('REQUEST_PROFILING', default=False, cast=bool)
+PROFILING_PUBLISH_INTERVAL = config('PROFILING_PUBLISH_INTERVAL', default=10, cast=int)
+QUERY_BUDGETS = {}
+QUERY_BUDGET_DEFAULT = config('QUERY_BUDGET_DEFAULT', default=0, cast=int)
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=False, cast=bool)
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
@@ -245,7 +338,8 @@ AUTH_PASSWORD_VALIDATORS = [
 MEDIA_URL = '/uploads/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'uploads')
 
-# Image uploads are intentionally unlimited at the Django layer. nginx
+# Image uploads are intentionally unlimited at the Django layer (decoding is
+# bounded by IMAGE_MAX_PIXELS instead). nginx
 # `client_max_body_size` still applies — set that to 0 (no limit) or a large
 # value if huge originals need to be accepted from the public internet.
 DATA_UPLOAD_MAX_MEMORY_SIZE = None
@@ -267,6 +361,9 @@ STATICFILES_DIRS = [
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 BOG_BASE_URL = os.getenv("BOG_BASE_URL", "https://api.bog.ge")  
+BOG_OAUTH_URL = os.getenv("BOG_OAUTH_URL", "https://oauth2.bog.ge/auth/realms/bog/protocol/openid-connect/token")
+# Max keep-alive connections held open to BOG per process.
+BOG_HTTP_POOL_SIZE = int(os.getenv("BOG_HTTP_POOL_SIZE", "10"))
 
 
 BOG_CLIENT_INN = os.getenv("BOG_CLIENT_INN", "BOG_CLIENT_INN")
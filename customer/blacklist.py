@@ -0,0 +1,97 @@
+"""Process-local copy of the BlackList table.
+
+Single addresses live in one set of integers per IP version. Ranges are
+grouped by prefix length, so a lookup masks the address once per distinct
+prefix length in use, not once per blocked range. The snapshot is reloaded
+when the shared `blacklist:version` cache key moves. A BlackList save or
+delete bumps that key, and the shared value is re-read at most every
+CHECK_INTERVAL seconds. Where the cache is not shared between workers the
+key never moves for the others, so there the snapshot is also reloaded
+once it is BLACKLIST_MAX_AGE seconds old.
+"""
+import ipaddress
+import threading
+import time
+
+from django.conf import settings
+
+from core.cache import bump_version, get_version
+from .models import BlackList
+
+VERSION_KEY = 'blacklist:version'
+CHECK_INTERVAL = 1.0
+
+_lock = threading.Lock()
+_snapshot = None
+_version = None
+_checked_at = 0.0
+_loaded_at = 0.0
+
+
+class _Snapshot:
+    def __init__(self, rows):
+        # {ip version: {prefix length: {masked network int}}}
+        self.networks = {4: {}, 6: {}}
+        for ip, prefix_length in rows:
+            try:
+                address = ipaddress.ip_address(ip)
+            except ValueError:
+                continue
+            bits = address.max_prefixlen
+            length = bits if prefix_length is None else min(prefix_length, bits)
+            self.networks[address.version].setdefault(length, set()).add(
+                int(address) & _mask(length, bits)
+            )
+        self.lengths = {version: sorted(tables) for version, tables in self.networks.items()}
+
+    def contains(self, address):
+        tables = self.networks[address.version]
+        value = int(address)
+        bits = address.max_prefixlen
+        return any(value & _mask(length, bits) in tables[length] for length in self.lengths[address.version])
+
+
+def _mask(length, bits):
+    return ((1 << length) - 1) << (bits - length)
+
+
+def _load():
+    global _snapshot, _version, _checked_at, _loaded_at
+    version = get_version(VERSION_KEY)
+    snapshot = _Snapshot(BlackList.objects.values_list('ip', 'prefix_length'))
+    with _lock:
+        _snapshot, _version = snapshot, version
+        _checked_at = _loaded_at = time.monotonic()
+    return snapshot
+
+
+def _current():
+    global _checked_at
+    snapshot = _snapshot
+    if snapshot is None:
+        return _load()
+    max_age = settings.BLACKLIST_MAX_AGE
+    if max_age and time.monotonic() - _loaded_at >= max_age:
+        return _load()
+    if time.monotonic() - _checked_at >= CHECK_INTERVAL:
+        _checked_at = time.monotonic()
+        if get_version(VERSION_KEY) != _version:
+            return _load()
+    return snapshot
+
+
+def is_blacklisted(ip):
+    try:
+        address = ipaddress.ip_address((ip or '').strip())
+    except ValueError:
+        return False
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return _current().contains(address)
+
+
+def blacklist_changed(**kwargs):
+    """Signal receiver for BlackList saves and deletes."""
+    global _snapshot
+    bump_version(VERSION_KEY)
+    _snapshot = None
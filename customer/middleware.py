@@ -1,8 +1,12 @@
 from django.utils import timezone
-from .models import BlackList, CustomerSession
+from core.sessions import SessionResolver
+from .blacklist import is_blacklisted
+from .models import CustomerSession
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.authentication import BaseAuthentication
 
+customer_sessions = SessionResolver('customer', CustomerSession, 'customer')
+
 class CustomerSessionMiddleware(BaseAuthentication):
     def authenticate(self, request):
         session_token = request.COOKIES.get('customer_session_token')
@@ -10,12 +14,11 @@ class CustomerSessionMiddleware(BaseAuthentication):
         if not session_token:
             return None
 
-        try:
-            session = CustomerSession.objects.get(session_token=session_token)
-        except CustomerSession.DoesNotExist:
+        session = customer_sessions.resolve(session_token)
+        if session is None:
             raise AuthenticationFailed('Invalid session token')
 
-        if BlackList.objects.filter(ip=session.ip).exists():
+        if is_blacklisted(session.ip):
             session.delete()
             raise AuthenticationFailed('Your IP is blacklisted')
 
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blacklist',
+            name='prefix_length',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Block the whole network ip/prefix_length (e.g. 24 for a /24). Leave empty to block only this address.', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0002_blacklist_prefix_length'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customersession',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
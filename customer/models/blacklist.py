@@ -1,9 +1,17 @@
+import ipaddress
+
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from panel.models import Admin
 
 class BlackList(models.Model):
     ip = models.GenericIPAddressField(unique=True)
+    prefix_length = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text=_("Block the whole network ip/prefix_length (e.g. 24 for a /24). Leave empty to block only this address."),
+    )
     reason = models.TextField()
     created_by = models.ForeignKey(Admin, on_delete=models.CASCADE, related_name='black_lists')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -13,5 +21,20 @@ class BlackList(models.Model):
         verbose_name_plural = _("Blacklists")
 
     def __str__(self):
-        return f"{self.ip} - {self.reason}"
+        return f"{self.network} - {self.reason}"
+
+    @property
+    def network(self):
+        if self.prefix_length is None:
+            return self.ip
+        return f"{self.ip}/{self.prefix_length}"
+
+    def clean(self):
+        if self.prefix_length is not None and self.ip:
+            try:
+                network = ipaddress.ip_network(self.network, strict=False)
+            except ValueError as e:
+                raise ValidationError({'prefix_length': str(e)})
+            # Store the network address so the row reads as the range it blocks.
+            self.ip = str(network.network_address)
     
\ No newline at end of file
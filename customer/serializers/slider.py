@@ -1,7 +1,10 @@
 from rest_framework import serializers
 from panel.models import Slider
+from services.serializers.fields import ImageVariantsField
 
 class SliderSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Slider
-        fields = ['id', 'image', 'title', 'description', 'link']
+        fields = ['id', 'image', 'image_status', 'image_variants', 'title', 'description', 'link']
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+
+from .blacklist import blacklist_changed
+from .middleware import customer_sessions
+from .models import BlackList
+
+post_save.connect(blacklist_changed, sender=BlackList, dispatch_uid='blacklist-save')
+post_delete.connect(blacklist_changed, sender=BlackList, dispatch_uid='blacklist-delete')
+
+customer_sessions.connect()
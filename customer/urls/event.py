@@ -2,11 +2,14 @@ from django.urls import path
 from ..views.event import (
     EventDetailView,
     EventListView,
+    NearbyEventsView,
     PopularEventsView,
     FeaturedEventsView,
     DiscountedEventsView,
     SearchView,
-    PriceCalculationView
+    SuggestView,
+    PriceCalculationView,
+    BulkPriceCalculationView,
 )
 
 urlpatterns = [
@@ -15,9 +18,12 @@ urlpatterns = [
     path('details/<int:pk>', EventDetailView.as_view(), name='event-detail'),
     path('feed/popular', PopularEventsView.as_view(), name='popular-events'),
     path('feed/featured', FeaturedEventsView.as_view(), name='featured-events'),
+    path('feed/nearby', NearbyEventsView.as_view(), name='nearby-events'),
     path('feed/discounted', DiscountedEventsView.as_view(), name='discounted-events'),
 
     # Search & price
     path('search', SearchView.as_view(), name='search'),
+    path('suggest', SuggestView.as_view(), name='event-suggest'),
     path('price-calculate', PriceCalculationView.as_view(), name='price-calculate'),
+    path('price-calculate/bulk', BulkPriceCalculationView.as_view(), name='price-calculate-bulk'),
 ]
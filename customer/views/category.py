@@ -1,9 +1,10 @@
 from rest_framework import generics, permissions, status
 from services.serializers.category import CategorySerializer
 from services.models import Category
+from core.cache import CachedCatalogMixin
 
-class CategoryListView(generics.ListAPIView):
-    queryset = Category.objects.filter(is_active=True)
+class CategoryListView(CachedCatalogMixin, generics.ListAPIView):
+    queryset = Category.objects.filter(is_active=True).with_events_count()
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
\ No newline at end of file
@@ -2,8 +2,9 @@ from django.db.models import Q
 from rest_framework import generics, permissions
 from services.serializers.city import CitySerializer
 from services.models import City
+from core.cache import CachedCatalogMixin
 
-class CityListView(generics.ListAPIView):
+class CityListView(CachedCatalogMixin, generics.ListAPIView):
     queryset = City.objects.filter(
         Q(is_active=True) & Q(country__is_active=True)
     )
@@ -1,8 +1,9 @@
 from rest_framework import generics, permissions
 from services.serializers.country import CountrySerializer
 from services.models import Country
+from core.cache import CachedCatalogMixin
 
-class CountryListView(generics.ListAPIView):
+class CountryListView(CachedCatalogMixin, generics.ListAPIView):
     queryset = Country.objects.filter(is_active=True)
     serializer_class = CountrySerializer
     permission_classes = [permissions.AllowAny]
@@ -7,7 +7,8 @@ from django.middleware.csrf import get_token
 import uuid
 from django.utils.timezone import now
 from datetime import timedelta
-from ..models import CustomerSession, BlackList, Customer
+from ..models import CustomerSession, Customer
+from ..blacklist import is_blacklisted
 from core.utils import get_client_ip
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
@@ -42,7 +43,7 @@ class GoogleLoginView(generics.GenericAPIView):
         except ValueError:
             return Response({'details': 'Invalid Google Token'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if BlackList.objects.filter(ip=get_client_ip(request)).exists():
+        if is_blacklisted(get_client_ip(request)):
             return Response({'details': 'Your IP is blacklisted'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
@@ -103,9 +104,7 @@ class RegisterView(generics.GenericAPIView):
         token = str(uuid.uuid4())
         expires_at = now() + timedelta(days=2)
 
-        blacklisted_ip = BlackList.objects.filter(ip=get_client_ip(request)).first()
-        
-        if blacklisted_ip:
+        if is_blacklisted(get_client_ip(request)):
             return Response({'details': 'Your IP is blacklisted'}, status=status.HTTP_400_BAD_REQUEST)
         
         session = CustomerSession.objects.create(
@@ -1,28 +1,61 @@
-from django.db.models import Q
 from django.utils import timezone
-from rest_framework import generics, permissions, filters
+from rest_framework import generics, permissions, filters, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 
 from services.models import Event
-from services.serializers.event import EventListSerializer, EventDetailSerializer, PriceCalculationSerializer
-from services.filters.event import EventFilter
+from services.serializers.event import EventListSerializer, EventDetailSerializer, NearbyEventSerializer, PriceCalculationSerializer, BulkPriceQuoteSerializer
+from services.filters.event import EventFilter, EventSearchFilter
+from services.search import search_events
+from services.view_counts import record_event_view
+from services.suggest import suggest, SUGGEST_MAX_RESULTS
+from core.utils import get_lang_from_path
+from core.pagination import CreatedAtCursorPagination
+from core.cache import CachedCatalogMixin
 
 class EventListView(generics.ListAPIView):
     queryset = Event.objects.filter(
         city__is_active=True,
         city__country__is_active=True,
         category__is_active=True
-    ).select_related('city', 'company', 'category', 'city__country').with_review_stats()
+    ).for_feed().with_review_stats()
     serializer_class = EventListSerializer
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, EventSearchFilter, filters.OrderingFilter]
     filterset_class = EventFilter
-    search_fields = ['name', 'description']
     ordering_fields = ['created_at', 'base_price', 'bookings_count', 'views_count']
     ordering = ['-created_at']
+    pagination_class = CreatedAtCursorPagination
+
+class NearbyEventsView(generics.ListAPIView):
+    queryset = Event.objects.filter(
+        is_active=True,
+        city__is_active=True,
+        city__country__is_active=True,
+        category__is_active=True
+    ).for_feed().with_review_stats()
+    serializer_class = NearbyEventSerializer
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = EventFilter
+    max_results = 200
+
+    def list(self, request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get('limit', 50))
+        except ValueError:
+            limit = 50
+        limit = max(1, min(limit, self.max_results))
+        queryset = self.filter_queryset(self.get_queryset())
+        # EventFilter only annotates `distance` once both coordinates
+        # validate; a blank or missing one leaves nothing to sort by.
+        if 'distance' not in queryset.query.annotations:
+            return Response({'details': 'latitude and longitude are required'}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = queryset.order_by('distance', 'pk')[:limit]
+        return Response(self.get_serializer(queryset, many=True).data)
 
 class EventDetailView(generics.RetrieveAPIView):
     queryset = Event.objects.filter(
@@ -36,13 +69,12 @@ class EventDetailView(generics.RetrieveAPIView):
     
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.views_count += 1
-        instance.save(update_fields=['views_count'])
-        
+        record_event_view(instance.pk)
+
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
-class PopularEventsView(generics.ListAPIView):
+class PopularEventsView(CachedCatalogMixin, generics.ListAPIView):
     serializer_class = EventListSerializer
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
@@ -54,9 +86,9 @@ class PopularEventsView(generics.ListAPIView):
             city__is_active=True,
             city__country__is_active=True,
             category__is_active=True
-        ).select_related('category', 'city', 'city__country', 'company').with_review_stats()[:10]
+        ).for_feed().with_review_stats()[:10]
 
-class FeaturedEventsView(generics.ListAPIView):
+class FeaturedEventsView(CachedCatalogMixin, generics.ListAPIView):
     serializer_class = EventListSerializer
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
@@ -68,7 +100,7 @@ class FeaturedEventsView(generics.ListAPIView):
             city__is_active=True,
             city__country__is_active=True,
             category__is_active=True
-        ).select_related('category', 'city', 'city__country', 'company').with_review_stats()[:10]
+        ).for_feed().with_review_stats()[:10]
 
 class DiscountedEventsView(generics.ListAPIView):
     serializer_class = EventListSerializer
@@ -85,7 +117,7 @@ class DiscountedEventsView(generics.ListAPIView):
             city__is_active=True,
             city__country__is_active=True,
             category__is_active=True
-        ).distinct().select_related('category', 'city', 'city__country', 'company').with_review_stats()
+        ).distinct().for_feed().with_review_stats()
     
 
 class PriceCalculationView(APIView):
@@ -97,6 +129,15 @@ class PriceCalculationView(APIView):
         serializer.is_valid(raise_exception=True)
         return Response(serializer.to_representation(serializer.validated_data))
 
+class BulkPriceCalculationView(APIView):
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def post(self, request):
+        serializer = BulkPriceQuoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.to_representation(serializer.validated_data))
+
 class SearchView(APIView):
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
@@ -106,13 +147,27 @@ class SearchView(APIView):
         if not query:
             return Response([])
         
-        events = Event.objects.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query),
-            is_active=True,
-            city__is_active=True,
-            city__country__is_active=True,
-            category__is_active=True
-        ).with_review_stats()[:10]
+        events = search_events(
+            Event.objects.filter(
+                is_active=True,
+                city__is_active=True,
+                city__country__is_active=True,
+                category__is_active=True
+            ).for_feed().with_review_stats(),
+            query,
+        )[:10]
         
         return Response(EventListSerializer(events, many=True).data)
+
+class SuggestView(APIView):
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            limit = 10
+        limit = max(1, min(limit, SUGGEST_MAX_RESULTS))
+        return Response(suggest(query, get_lang_from_path(request), limit))
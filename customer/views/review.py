@@ -1,8 +1,12 @@
+from django.core.cache import cache
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.cache import get_version, reviews_version_key
+from core.pagination import CreatedAtCursorPagination
 from services.models import Event, Review
 from services.serializers.review import ReviewCreateSerializer, ReviewSerializer
 
@@ -10,14 +14,60 @@ from ..middleware import CustomerSessionMiddleware
 from ..permissions import AllowAny, IsCustomerAuthenticated
 
 
+REVIEW_PAGE_CACHE_TIMEOUT = 300
+
+
+class ReviewCursorPagination(CreatedAtCursorPagination):
+    # Newest first with id as tie-breaker, the (event, created_at, id)
+    # index read backwards, so each page is one indexed range scan.
+    ordering = ('-created_at', '-id')
+    page_size = 10
+
+
+def _parse_ratings(value):
+    ratings = sorted({int(part) for part in value.split(',') if part.strip()})
+    if not ratings or ratings[0] < 1 or ratings[-1] > 5:
+        raise ValueError(value)
+    return ratings
+
+
 class ReviewListView(APIView):
+    """Newest reviews of an event, cursor-paginated, optionally filtered with
+    `?rating=5` or `?rating=4,5`. The first page is cached until the event's
+    reviews change."""
     permission_classes = [AllowAny]
     authentication_classes = []
 
     def get(self, request, event_id):
-        get_object_or_404(Event, id=event_id)
+        ratings = None
+        if request.query_params.get('rating'):
+            try:
+                ratings = _parse_ratings(request.query_params['rating'])
+            except ValueError:
+                return Response({'details': 'rating must be a comma-separated list of 1-5'},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = ReviewCursorPagination()
+        cache_key = None
+        if 'cursor' not in request.query_params:
+            version = get_version(reviews_version_key(event_id))
+            page_size = paginator.get_page_size(request)
+            cache_key = f"reviews:{event_id}:{version}:{ratings}:{page_size}"
+            data = cache.get(cache_key)
+            if data is not None:
+                return Response(data)
+
         reviews = Review.objects.filter(event_id=event_id).select_related('customer')
-        return Response(ReviewSerializer(reviews, many=True).data)
+        if ratings:
+            reviews = reviews.filter(rating__in=ratings)
+        page = paginator.paginate_queryset(reviews, request, view=self)
+        # Only an empty page needs to tell a missing event from one without reviews.
+        if not page and not Event.objects.filter(id=event_id).exists():
+            raise Http404
+        response = paginator.get_paginated_response(ReviewSerializer(page, many=True).data)
+        if cache_key is not None:
+            cache.set(cache_key, response.data, timeout=REVIEW_PAGE_CACHE_TIMEOUT)
+        return response
 
 
 class ReviewCreateView(APIView):
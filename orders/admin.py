@@ -1,7 +1,12 @@
 from django.contrib import admin
-from orders.models import Order, Payment
+from orders.models import Order, Payment, PaymentCallback, EmailJob, EventSlot, SeatHold, IdempotencyKey
 # Register your models here.
 
 
 admin.site.register(Payment)
+admin.site.register(PaymentCallback)
 admin.site.register(Order)
+admin.site.register(EmailJob)
+admin.site.register(EventSlot)
+admin.site.register(SeatHold)
+admin.site.register(IdempotencyKey)
@@ -0,0 +1,119 @@
+"""Shared HTTP plumbing for Bank of Georgia gateway calls.
+
+One keep-alive `requests.Session` per process, so consecutive calls reuse
+pooled TLS connections, and one client-credentials token per process,
+reused until shortly before the `expires_in` BOG returned for it. A call
+answered with 401 (BOG revoked the token early) drops the token and is
+retried once with a fresh one.
+Point BOG_OAUTH_URL / BOG_BASE_URL at a local stub to exercise it offline.
+"""
+import base64
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Refresh this many seconds before expiry (or at 90% of a shorter lifetime)
+# so a token never expires between being handed out and reaching BOG.
+TOKEN_REFRESH_MARGIN = 60
+DEFAULT_TOKEN_LIFETIME = 300
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=settings.BOG_HTTP_POOL_SIZE,
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+class TokenCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._token = None
+        self._client_id = None
+        self._refresh_at = 0.0
+
+    def _valid(self, client_id):
+        return self._token is not None and self._client_id == client_id and time.monotonic() < self._refresh_at
+
+    def get(self, client_id, client_secret):
+        token = self._token
+        if self._valid(client_id):
+            return token
+        with self._lock:
+            # Another thread may have refreshed while we waited.
+            if self._valid(client_id):
+                return self._token
+            token, expires_in = self._fetch(client_id, client_secret)
+            margin = min(TOKEN_REFRESH_MARGIN, expires_in * 0.1)
+            self._token = token
+            self._client_id = client_id
+            self._refresh_at = time.monotonic() + expires_in - margin
+            return token
+
+    def invalidate(self, token=None):
+        with self._lock:
+            if token is None or token == self._token:
+                self._token = None
+                self._refresh_at = 0.0
+
+    def _fetch(self, client_id, client_secret):
+        auth_str = f"{client_id}:{client_secret}"
+        base64_auth = base64.b64encode(auth_str.encode()).decode()
+
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Authorization": f"Basic {base64_auth}",
+        }
+
+        data = {"grant_type": "client_credentials"}
+
+        response = get_session().post(settings.BOG_OAUTH_URL, headers=headers, data=data, timeout=10)
+        if response.status_code == 200:
+            body = response.json()
+            try:
+                expires_in = float(body.get("expires_in") or DEFAULT_TOKEN_LIFETIME)
+            except (TypeError, ValueError):
+                expires_in = DEFAULT_TOKEN_LIFETIME
+            return body["access_token"], expires_in
+        logger.error("BOG token request failed status=%s body=%s",
+                     response.status_code, (response.text or "")[:500])
+        raise RuntimeError(f"Failed to get BOG token (status {response.status_code})")
+
+
+token_cache = TokenCache()
+
+
+def get_access_token(client_id=None, client_secret=None):
+    return token_cache.get(client_id or settings.BOG_PUBLIC_KEY, client_secret or settings.BOG_SECRET_KEY)
+
+
+def request(method, url, headers, **kwargs):
+    """Send an authenticated call to BOG over the shared session."""
+    response = get_session().request(method, url, headers=headers, **kwargs)
+    if response.status_code != 401:
+        return response
+    token_cache.invalidate(headers.get("Authorization", "").removeprefix("Bearer "))
+    try:
+        token = get_access_token()
+    except Exception:
+        logger.exception("BOG token refresh after 401 failed")
+        return response
+    return get_session().request(method, url, headers={**headers, "Authorization": f"Bearer {token}"}, **kwargs)
@@ -0,0 +1,136 @@
+"""Ingestion of BOG payment callbacks.
+
+BOG redelivers each callback several times, and after an outage sends a
+burst of them, not necessarily in order. Every verified callback is
+inserted as a PaymentCallback; the unique (BOG order id, status) index
+turns a repeat into one failed INSERT, which is acknowledged straight away
+without reading or locking the order.
+
+A new callback is applied in the same transaction, with the order and its
+payment locked (select_for_update), so concurrent callbacks for one order
+apply one after the other while other orders proceed in parallel. Statuses
+only move forward along STATUS_RANK: a callback for an earlier status than
+the order already has is recorded but changes nothing. If applying fails,
+the whole transaction rolls back, the callback row included, so BOG's next
+delivery is processed afresh.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+
+from . import capacity
+from .emails import enqueue_order_confirmation
+from .models import Order
+from .models.payment import Payment, PaymentCallback
+
+logger = logging.getLogger(__name__)
+
+# BOG order_status.key -> our Order/Payment status.
+STATUS_MAP = {
+    "completed": "paid",
+    "processing": "processing",
+    "created": "pending",
+    "rejected": "failed",
+    "refund_requested": "refund_requested",
+    "refunded": "refunded",
+    "refunded_partially": "partial_refunded",
+    "partial_completed": "partial_paid",
+    "blocked": "blocked",
+    "auth_requested": "auth_requested",
+}
+
+# A callback may only move an order to a status of higher rank. `failed`
+# ranks below the paid statuses: a payment retried after a rejection (a new
+# BOG order for the same order) can still complete it. Likewise a full
+# refund supersedes a partial one.
+STATUS_RANK = {
+    "pending": 0,
+    "processing": 1,
+    "auth_requested": 1,
+    "blocked": 2,
+    "failed": 3,
+    "partial_paid": 4,
+    "paid": 5,
+    "refund_requested": 6,
+    "partial_refunded": 7,
+    "refunded": 8,
+}
+
+APPLIED = "applied"
+DUPLICATE = "duplicate"
+STALE = "stale"
+UNKNOWN_ORDER = "unknown_order"
+
+
+def can_move(current, new):
+    return STATUS_RANK.get(new, 0) > STATUS_RANK.get(current, 0)
+
+
+def _apply(order, bog_status, status, body, data):
+    payment_detail = body.get("payment_detail", {}) or {}
+    purchase_units = body.get("purchase_units", {}) or {}
+    method_key = (payment_detail.get("transfer_method", {}) or {}).get("key", "")
+
+    newly_paid = status == "paid" and order.status != "paid"
+    order.status = status
+    order.save(update_fields=["status", "updated_at"])
+    if newly_paid:
+        enqueue_order_confirmation(order)
+    if status == "paid":
+        capacity.confirm_seats(order)
+    elif bog_status in ("rejected", "refunded"):
+        # A partial refund keeps the booking, and its seats.
+        capacity.release_seats(order)
+
+    payment = Payment.objects.select_for_update().filter(order=order).first() or Payment(order=order)
+    payment.payment_method = method_key or "card"
+    payment.amount = Decimal(purchase_units.get("transfer_amount") or "0")
+    payment.requested_amount = order.total_price
+    payment.currency = getattr(order, "currency", "GEL")
+    payment.transaction_id = payment_detail.get("transaction_id", "")
+    payment.status = status
+    payment.method_provider = method_key
+    payment.card_type = payment_detail.get("card_type", "")
+    payment.payer_identifier = payment_detail.get("payer_identifier", "")
+    payment.result_code = payment_detail.get("code", "")
+    payment.result_message = payment_detail.get("code_description", "")
+    payment.payment_gateway_response = data
+    payment.save()
+
+
+def ingest(data):
+    """Record one verified callback (the parsed request body) and apply it
+    if it is new and moves the order forward. Returns APPLIED, DUPLICATE,
+    STALE or UNKNOWN_ORDER."""
+    body = data.get("body", {}) or {}
+    external_order_id = body.get("external_order_id") or body.get("order_id")
+    bog_order_id = body.get("order_id") or external_order_id
+    bog_status = (body.get("order_status", {}) or {}).get("key", "pending")
+    status = STATUS_MAP.get(bog_status, "pending")
+
+    with transaction.atomic():
+        try:
+            # No savepoint: a repeat just rolls the outer transaction back.
+            with transaction.atomic(savepoint=False):
+                callback = PaymentCallback.objects.create(
+                    bog_order_id=bog_order_id, bog_status=bog_status, payload=data,
+                )
+        except IntegrityError:
+            return DUPLICATE
+
+        order = Order.objects.select_for_update().filter(order_number=external_order_id).first()
+        if order is None:
+            # Not kept, so a redelivery once the order exists is applied.
+            transaction.set_rollback(True)
+            return UNKNOWN_ORDER
+
+        callback.order = order
+        callback.applied = can_move(order.status, status)
+        callback.save(update_fields=["order", "applied"])
+        if not callback.applied:
+            logger.info("BOG callback %s %s for order %s ignored: order is already %s.",
+                        bog_order_id, bog_status, order.order_number, order.status)
+            return STALE
+        _apply(order, bog_status, status, body, data)
+    return APPLIED
@@ -0,0 +1,162 @@
+"""Seat capacity per event slot (event, Order.event_date), enforced against
+Event.max_people.
+
+Every slot has one EventSlot counter row. Creating an order takes its seats
+with a single conditional UPDATE on that row (held + sold + seats <=
+max_people), so concurrent checkouts for a slot only wait on each other for
+that statement's row lock, and checkouts for other slots or events not at
+all. The order's SeatHold records the seats and moves between held, sold
+and released; each move is a conditional UPDATE of the hold followed by
+the matching change to the counters, in one transaction, so it is applied
+exactly once however many callbacks or sweepers race for it.
+
+A hold lasts SEAT_HOLD_TTL seconds from checkout and is extended to
+SEAT_HOLD_PAYMENT_TTL when payment starts. Holds that run out are released
+by `manage.py release_seat_holds` (run it from cron), and by an in-process
+thread every SEAT_HOLD_SWEEP_INTERVAL seconds if that is set; a checkout
+that finds its slot full releases the slot's lapsed holds itself before
+giving up. An order paid after its hold lapsed keeps its seats even if
+that oversells the slot: the money has been taken.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.background import PeriodicJob
+from .models.capacity import EventSlot, SeatHold
+
+logger = logging.getLogger(__name__)
+
+HELD = SeatHold.HELD
+SOLD = SeatHold.SOLD
+RELEASED = SeatHold.RELEASED
+
+# Change to (held, sold), per seat, of each hold transition.
+_TRANSITIONS = {
+    (HELD, SOLD): (-1, 1),
+    (HELD, RELEASED): (-1, 0),
+    (RELEASED, SOLD): (0, 1),
+    (SOLD, RELEASED): (0, -1),
+}
+
+
+class SlotFull(Exception):
+    def __init__(self, seats_left):
+        super().__init__(f"{seats_left} seats left.")
+        self.seats_left = seats_left
+
+
+def _take(slot_id, seats, max_people):
+    return EventSlot.objects.filter(
+        pk=slot_id, held__lte=max_people - seats - F('sold'),
+    ).update(held=F('held') + seats)
+
+
+def seats_left(slot_id, max_people):
+    taken = EventSlot.objects.filter(pk=slot_id).values_list(F('held') + F('sold'), flat=True).first() or 0
+    return max(max_people - taken, 0)
+
+
+def _take_or_sweep(slot_id, seats, max_people):
+    if _take(slot_id, seats, max_people):
+        return
+    # Lapsed holds may still be counted if the sweeper hasn't run yet.
+    if release_expired_holds(slot_id=slot_id) and _take(slot_id, seats, max_people):
+        return
+    raise SlotFull(seats_left(slot_id, max_people))
+
+
+def _transition(hold, old, new, **conditions):
+    """Move `hold` from `old` to `new` and adjust its slot, if it is still `old`."""
+    held, sold = _TRANSITIONS[old, new]
+    with transaction.atomic():
+        if not SeatHold.objects.filter(pk=hold.pk, status=old, **conditions).update(status=new):
+            return False
+        EventSlot.objects.filter(pk=hold.slot_id).update(
+            held=F('held') + held * hold.seats, sold=F('sold') + sold * hold.seats,
+        )
+    return True
+
+
+def hold_seats(order, ttl=None):
+    """Take `order.people_count` seats in its slot, or raise SlotFull.
+
+    Call in the transaction that creates the order: if that rolls back, so
+    does the hold.
+    """
+    _sweeper.ensure_started()
+    ttl = settings.SEAT_HOLD_TTL if ttl is None else ttl
+    slot, _ = EventSlot.objects.get_or_create(event_id=order.event_id, starts_at=order.event_date)
+    _take_or_sweep(slot.pk, order.people_count, order.event.max_people)
+    return SeatHold.objects.create(
+        order=order, slot=slot, seats=order.people_count,
+        expires_at=timezone.now() + timedelta(seconds=ttl),
+    )
+
+
+def renew_hold(order, ttl=None):
+    """Keep `order`'s seats for another `ttl` seconds (SEAT_HOLD_PAYMENT_TTL),
+    taking them again if its hold was released. Raises SlotFull if they are
+    gone meanwhile."""
+    ttl = settings.SEAT_HOLD_PAYMENT_TTL if ttl is None else ttl
+    expires_at = timezone.now() + timedelta(seconds=ttl)
+    with transaction.atomic():
+        if SeatHold.objects.filter(order_id=order.pk, status=HELD).update(expires_at=expires_at):
+            return
+        hold = SeatHold.objects.filter(order_id=order.pk).first()
+        if hold is None:
+            # Created before seats were counted.
+            hold_seats(order, ttl)
+            return
+        if not SeatHold.objects.filter(pk=hold.pk, status=RELEASED).update(status=HELD, expires_at=expires_at):
+            # Sold, or renewed by a concurrent request.
+            return
+        # Raising rolls the hold back to released.
+        _take_or_sweep(hold.slot_id, hold.seats, order.event.max_people)
+
+
+def confirm_seats(order):
+    """The order is paid: its held seats become sold."""
+    hold = SeatHold.objects.filter(order_id=order.pk).first()
+    if hold is None or _transition(hold, HELD, SOLD):
+        return
+    if _transition(hold, RELEASED, SOLD):
+        logger.warning("Order %s was paid after its seat hold lapsed; slot %s may be oversold.",
+                       order.order_number, hold.slot_id)
+
+
+def release_seats(order):
+    """The payment failed or was refunded: give the order's seats back."""
+    hold = SeatHold.objects.filter(order_id=order.pk).first()
+    if hold is not None and not _transition(hold, HELD, RELEASED):
+        _transition(hold, SOLD, RELEASED)
+
+
+def release_expired_holds(batch_size=None, slot_id=None):
+    """Release lapsed holds oldest first, `batch_size` per query; returns how many."""
+    batch_size = batch_size or settings.SEAT_HOLD_SWEEP_BATCH_SIZE
+    now = timezone.now()
+    due = SeatHold.objects.filter(status=HELD, expires_at__lte=now)
+    if slot_id is not None:
+        due = due.filter(slot_id=slot_id)
+    released = 0
+    while True:
+        holds = list(due.order_by('expires_at').only('pk', 'slot_id', 'seats')[:batch_size])
+        if not holds:
+            return released
+        for hold in holds:
+            # A hold renewed since it was read is left alone.
+            released += _transition(hold, HELD, RELEASED, expires_at__lte=now)
+
+
+def _sweep():
+    released = release_expired_holds()
+    if released:
+        logger.info("Released %s lapsed seat holds.", released)
+
+
+_sweeper = PeriodicJob('seat-hold-sweeper', _sweep, 'SEAT_HOLD_SWEEP_INTERVAL')
@@ -0,0 +1,285 @@
+"""Order confirmation emails, delivered through the EmailJob outbox.
+
+The BOG callback only inserts one EmailJob per recipient (customer, vendor,
+admin), in the same transaction that marks the order paid. `send_emails`
+workers claim due jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any
+number of them can run side by side. They render and send each job, and
+reschedule failures with exponential backoff until EMAIL_MAX_ATTEMPTS.
+
+The template comes from Django's cached loader, and each order's variants
+are rendered from one shared context, loaded with with_email_relations.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Prefetch, Q
+from django.template import Context, engines
+from django.utils import timezone
+from sendgrid import SendGridAPIClient
+from sendgrid.helpers.mail import Mail
+
+from services.models import EventImage
+from .models import Order
+from .models.email import EmailJob
+
+logger = logging.getLogger(__name__)
+
+EMAIL_MAX_ATTEMPTS = 8
+EMAIL_RETRY_BASE_DELAY = 30
+EMAIL_RETRY_MAX_DELAY = 60 * 60
+# A job left in `sending` this long belongs to a worker that died mid-send.
+EMAIL_CLAIM_TIMEOUT = 10 * 60
+
+ORDER_CONFIRMATION_TEMPLATE = "email/order_confirmation.html"
+
+
+def _confirmation_template():
+    # The cached template loader compiles it once, and drops it on template
+    # changes under the dev server's autoreloader.
+    return engines["django"].get_template(ORDER_CONFIRMATION_TEMPLATE).template
+
+
+def with_email_relations(queryset):
+    """Orders with everything the confirmation emails read: one joined query
+    for event, category, city and company, plus one for primary images."""
+    return queryset.select_related(
+        "event__category", "event__city", "event__company",
+    ).prefetch_related(
+        Prefetch(
+            "event__images",
+            queryset=EventImage.objects.filter(is_primary=True),
+            to_attr="primary_images",
+        ),
+    )
+
+
+def render_variants(base_ctx, variants):
+    """Render the confirmation template once per (subject, overrides) pair
+    on top of one shared base context."""
+    template = _confirmation_template()
+    context = Context(base_ctx)
+    rendered = []
+    for subject, overrides in variants:
+        with context.push(overrides, subject=subject):
+            rendered.append(template.render(context))
+    return rendered
+
+
+def build_email_context(order: Order):
+    """Shared context for the order_confirmation.html template."""
+    currency = getattr(order, "currency", "GEL")
+    event = getattr(order, "event", None)
+    ticket_type = event.event_ticket if event and event.event_ticket else (event.category.activity if event else "Unknown")
+    event_name = event.name if event else "N/A"
+
+    # Primary event image → absolute URL (blank if none).
+    hero_image_url = ""
+    if event is not None:
+        primary = event.get_primary_image()
+        if primary and primary.image:
+            try:
+                rel = primary.image.url
+            except ValueError:
+                rel = ""
+            if rel:
+                if rel.startswith("http://") or rel.startswith("https://"):
+                    hero_image_url = rel
+                else:
+                    site = getattr(settings, "SITE_URL", "https://funfinder.ge").rstrip("/")
+                    hero_image_url = f"{site}{rel}"
+
+    location_name = ""
+    location_address = ""
+    if event is not None:
+        location_name = getattr(getattr(event, "city", None), "name", "") or ""
+        location_address = getattr(event, "location", "") or ""
+
+    event_datetime = ""
+    if getattr(order, "event_date", None):
+        event_datetime = order.event_date.strftime("%A<br>%B %d, %Y<br>%I:%M %p")
+
+    order_year = order.created_at.year if getattr(order, "created_at", None) else 2026
+
+    return {
+        "customer_name": order.customer_name,
+        "event_name": event_name,
+        "artist_line": event_name,
+        "location_name": location_name,
+        "location_address": location_address,
+        "event_datetime": event_datetime,
+        "ticket_type": ticket_type,
+        "quantity": str(order.people_count),
+        "price": f"{order.total_price} {currency}",
+        "ticket_id": order.order_number,
+        "ticket_url": f"https://funfinder.ge/orders/{order.order_number}",
+        "hero_image_url": hero_image_url,
+        "year": str(order_year),
+    }
+
+
+def order_confirmation_jobs(order: Order):
+    """Unsaved EmailJobs for a newly paid order, one per configured recipient."""
+    event = getattr(order, "event", None)
+    company = getattr(event, "company", None) if event else None
+    event_name = event.name if event else "N/A"
+    company_name = company.name if company else "Unknown Company"
+    now = timezone.now()
+
+    jobs = [
+        EmailJob(
+            order=order,
+            kind="customer",
+            to_email=order.customer_email,
+            subject=f"Your FunFinder ticket — {event_name}",
+            context={
+                "heading": "Order confirmation",
+                "intro": f"Thank you for your purchase, {order.customer_name}! Please save or print your ticket before the event.",
+                "hero_eyebrow": "Order confirmed",
+            },
+            next_attempt_at=now,
+        ),
+    ]
+
+    # Vendor/company email — recipient is configured via env so we don't
+    # ship an internal address in source. Falls back to the company's own
+    # email on the event when the override is not set.
+    vendor_email = getattr(settings, "FUNFINDER_VENDOR_NOTIFICATION_EMAIL", "") or (
+        company.email if company else ""
+    )
+    if vendor_email:
+        jobs.append(EmailJob(
+            order=order,
+            kind="vendor",
+            to_email=vendor_email,
+            subject=f"New booking — {event_name}",
+            context={
+                "heading": "New booking received",
+                "intro": f"Hello {company_name}, you have a new paid booking from {order.customer_name} via FunFinder.",
+                "hero_eyebrow": "New booking",
+            },
+            next_attempt_at=now,
+        ))
+
+    # Admin email — recipient configured via env (FUNFINDER_ADMIN_EMAIL).
+    admin_email = getattr(settings, "FUNFINDER_ADMIN_EMAIL", "")
+    if admin_email:
+        jobs.append(EmailJob(
+            order=order,
+            kind="admin",
+            to_email=admin_email,
+            subject=f"[ADMIN] New transaction #{order.order_number}",
+            context={
+                "heading": "New transaction",
+                "intro": f"Payment processed for {order.customer_name} ({order.customer_email}) — vendor: {company_name}.",
+                "hero_eyebrow": "Admin alert",
+            },
+            next_attempt_at=now,
+        ))
+    else:
+        logger.info("FUNFINDER_ADMIN_EMAIL not configured; skipping admin email "
+                    "for order %s.", order.order_number)
+    return jobs
+
+
+def enqueue_order_confirmation(order: Order):
+    if not settings.SENDGRID_API_KEY:
+        logger.info("SendGrid API Key not set, skipping email for order %s.",
+                    order.order_number)
+        return
+    # ignore_conflicts: a retried callback must not queue the emails twice.
+    EmailJob.objects.bulk_create(order_confirmation_jobs(order), ignore_conflicts=True)
+
+
+def claim_email_jobs(limit):
+    """Atomically move up to `limit` due jobs to `sending` and return them."""
+    now = timezone.now()
+    due = Q(status="pending", next_attempt_at__lte=now) | Q(
+        status="sending", locked_at__lt=now - timedelta(seconds=EMAIL_CLAIM_TIMEOUT)
+    )
+    with transaction.atomic():
+        ids = list(
+            EmailJob.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by("next_attempt_at")
+            .values_list("id", flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        EmailJob.objects.filter(id__in=ids).update(
+            status="sending", locked_at=now, attempts=F("attempts") + 1
+        )
+    jobs = list(EmailJob.objects.filter(id__in=ids))
+    orders = with_email_relations(Order.objects.filter(id__in={job.order_id for job in jobs})).in_bulk()
+    for job in jobs:
+        job.order = orders[job.order_id]
+    return jobs
+
+
+def render_email_job(job: EmailJob, base_ctx=None):
+    base_ctx = base_ctx if base_ctx is not None else build_email_context(job.order)
+    return render_variants(base_ctx, [(job.subject, job.context)])[0]
+
+
+def send_email_job(job: EmailJob, sg=None, base_ctx=None):
+    sg = sg or SendGridAPIClient(settings.SENDGRID_API_KEY)
+    msg = Mail(
+        from_email=settings.SENDGRID_EMAIL_SENDER,
+        to_emails=job.to_email,
+        subject=job.subject,
+        html_content=render_email_job(job, base_ctx),
+    )
+    sg.send(msg)
+
+
+def _retry_delay(attempts):
+    return min(EMAIL_RETRY_BASE_DELAY * 2 ** (attempts - 1), EMAIL_RETRY_MAX_DELAY)
+
+
+def process_email_jobs(jobs):
+    """Send claimed jobs; returns (sent, failed) counts."""
+    sg = SendGridAPIClient(settings.SENDGRID_API_KEY)
+    contexts = {}
+    sent = failed = 0
+    for job in jobs:
+        try:
+            if job.order_id not in contexts:
+                contexts[job.order_id] = build_email_context(job.order)
+            send_email_job(job, sg, contexts[job.order_id])
+        except Exception as e:
+            failed += 1
+            now = timezone.now()
+            if job.attempts >= EMAIL_MAX_ATTEMPTS:
+                logger.exception("Giving up on %s email for order %s after %s attempts",
+                                 job.kind, job.order.order_number, job.attempts)
+                update = {"status": "failed"}
+            else:
+                logger.warning("Failed to send %s email for order %s (attempt %s)",
+                               job.kind, job.order.order_number, job.attempts, exc_info=True)
+                update = {"status": "pending", "next_attempt_at": now + timedelta(seconds=_retry_delay(job.attempts))}
+            EmailJob.objects.filter(pk=job.pk).update(locked_at=None, last_error=str(e)[:2000], updated_at=now, **update)
+        else:
+            sent += 1
+            now = timezone.now()
+            EmailJob.objects.filter(pk=job.pk).update(status="sent", sent_at=now, locked_at=None, updated_at=now)
+    return sent, failed
+
+
+def iter_order_confirmations(queryset, chunk_size=500):
+    """Yield (order, [(job, html), ...]) for every order in `queryset`.
+
+    For resend and backfill runs: orders are loaded `chunk_size` at a time
+    with with_email_relations, and each order's variants are rendered from
+    one shared context. The jobs are unsaved and describe each recipient.
+    """
+    ids = list(queryset.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(ids), chunk_size):
+        chunk = with_email_relations(Order.objects.filter(pk__in=ids[start:start + chunk_size])).order_by("pk")
+        for order in chunk:
+            jobs = order_confirmation_jobs(order)
+            rendered = render_variants(
+                build_email_context(order),
+                [(job.subject, job.context) for job in jobs],
+            )
+            yield order, list(zip(jobs, rendered))
@@ -0,0 +1,122 @@
+"""Idempotency keys for order and payment creation.
+
+A customer POST carrying an `Idempotency-Key` header claims an
+IdempotencyKey row for (customer, endpoint, key) before the view runs; the
+unique index on those columns lets exactly one of several concurrent
+retries through. The winner stores its status code and body on the row,
+and for IDEMPOTENCY_KEY_TTL seconds every retry with the same key and body
+gets that response back without running the view again (flagged with
+`Idempotent-Replayed: true`). A retry while the first request is still
+running gets a 409; one with a different body, a 422.
+
+Server errors (5xx) and exceptions, validation errors included, are not
+stored: the retry runs for real. A row left running by a process that
+died is taken over after IN_PROGRESS_TIMEOUT seconds. Requests without
+the header behave as before.
+"""
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .models.idempotency import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+IN_PROGRESS_TIMEOUT = 60
+
+
+def _fingerprint(request):
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    body = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def _claim(customer, scope, key, fingerprint):
+    """(row, True) if this request should run, (existing row, False) if not."""
+    now = timezone.now()
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(
+                    customer=customer, scope=scope, key=key, fingerprint=fingerprint,
+                    started_at=now, expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                ), True
+        except IntegrityError:
+            pass
+        existing = IdempotencyKey.objects.filter(customer=customer, scope=scope, key=key).first()
+        if existing is None:
+            continue
+        if existing.expires_at <= now:
+            # Outside the window the key is free again.
+            IdempotencyKey.objects.filter(pk=existing.pk, expires_at__lte=now).delete()
+            continue
+        stale = now - timedelta(seconds=IN_PROGRESS_TIMEOUT)
+        if (existing.status_code is None and existing.fingerprint == fingerprint
+                and IdempotencyKey.objects.filter(pk=existing.pk, status_code__isnull=True,
+                                                  started_at__lte=stale).update(started_at=now)):
+            return existing, True
+        return existing, False
+    return None, False
+
+
+def idempotent(scope):
+    """Decorate a view's POST handler (after authentication has set
+    `request.customer`) to honour Idempotency-Key. The key, or None, is
+    exposed to the handler as `request.idempotency_key`."""
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            key = request.headers.get(HEADER)
+            request.idempotency_key = key
+            if not key:
+                return handler(view, request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response({"error": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters."}, status=400)
+
+            fingerprint = _fingerprint(request)
+            record, claimed = _claim(request.customer, scope, key, fingerprint)
+            if record is None:
+                return Response({"error": "Please retry the request."}, status=409)
+            if not claimed:
+                if record.fingerprint != fingerprint:
+                    return Response({"error": f"{HEADER} was already used for a different request."}, status=422)
+                if record.status_code is None:
+                    return Response({"error": "A request with this Idempotency-Key is still in progress."},
+                                    status=409, headers={"Retry-After": "1"})
+                return Response(record.response, status=record.status_code,
+                                headers={"Idempotent-Replayed": "true"})
+
+            try:
+                response = handler(view, request, *args, **kwargs)
+            except Exception:
+                IdempotencyKey.objects.filter(pk=record.pk).delete()
+                raise
+            if response.status_code >= 500 or not hasattr(response, 'data'):
+                IdempotencyKey.objects.filter(pk=record.pk).delete()
+            else:
+                IdempotencyKey.objects.filter(pk=record.pk).update(
+                    status_code=response.status_code, response=response.data,
+                )
+            return response
+        return wrapper
+    return decorator
+
+
+def purge_expired(batch_size=1000):
+    """Delete keys past their window, `batch_size` rows per query."""
+    deleted = 0
+    now = timezone.now()
+    while True:
+        ids = list(IdempotencyKey.objects.filter(expires_at__lte=now).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        IdempotencyKey.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
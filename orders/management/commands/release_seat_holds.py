@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from orders.capacity import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Give back the seats of unpaid orders whose hold has lapsed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        released = release_expired_holds(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Released {released} seat holds."))
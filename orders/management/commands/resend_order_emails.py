@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from sendgrid import SendGridAPIClient
+from sendgrid.helpers.mail import Mail
+
+from orders.emails import iter_order_confirmations
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    help = "Re-render and resend confirmation emails for paid orders, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--order", action="append", default=[], dest="orders",
+                            help="Order number; may be repeated.")
+        parser.add_argument("--paid-since", help="Every paid order created on or after this date (YYYY-MM-DD).")
+        parser.add_argument("--kind", choices=["customer", "vendor", "admin"],
+                            help="Only resend this recipient's email.")
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Render everything but send nothing.")
+
+    def handle(self, *args, **options):
+        orders = Order.objects.filter(status="paid")
+        if options["orders"]:
+            orders = orders.filter(order_number__in=options["orders"])
+        elif options["paid_since"]:
+            orders = orders.filter(created_at__date__gte=options["paid_since"])
+        else:
+            raise CommandError("Pass --order or --paid-since.")
+
+        sg = None if options["dry_run"] else SendGridAPIClient(settings.SENDGRID_API_KEY)
+        sent = failed = 0
+        for order, emails in iter_order_confirmations(orders, chunk_size=options["chunk_size"]):
+            for job, html in emails:
+                if options["kind"] and job.kind != options["kind"]:
+                    continue
+                if sg is None:
+                    sent += 1
+                    continue
+                try:
+                    sg.send(Mail(
+                        from_email=settings.SENDGRID_EMAIL_SENDER,
+                        to_emails=job.to_email,
+                        subject=job.subject,
+                        html_content=html,
+                    ))
+                    sent += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{order.order_number} {job.kind}: {e}")
+
+        verb = "Rendered" if options["dry_run"] else "Sent"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {sent} emails, {failed} failed."))
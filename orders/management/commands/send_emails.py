@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from orders.emails import claim_email_jobs, process_email_jobs
+
+
+class Command(BaseCommand):
+    help = "Send queued order emails. Safe to run as several parallel workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument("--idle-sleep", type=float, default=2.0,
+                            help="Seconds to wait when no jobs are due.")
+        parser.add_argument("--once", action="store_true",
+                            help="Drain the currently due jobs and exit.")
+
+    def handle(self, *args, **options):
+        while True:
+            jobs = claim_email_jobs(options["batch_size"])
+            if jobs:
+                sent, failed = process_email_jobs(jobs)
+                self.stdout.write(f"Sent {sent} emails, {failed} failed.")
+            elif options["once"]:
+                return
+            else:
+                close_old_connections()
+                time.sleep(options["idle_sleep"])
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:35
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def fill_slots(apps, schema_editor):
+    # Seats of paid orders for upcoming dates count as sold from the start.
+    Order = apps.get_model('orders', 'Order')
+    EventSlot = apps.get_model('orders', 'EventSlot')
+    SeatHold = apps.get_model('orders', 'SeatHold')
+    orders = list(
+        Order.objects.filter(status='paid', event_date__gte=timezone.now())
+        .values_list('pk', 'event_id', 'event_date', 'people_count')
+    )
+    sold = {}
+    for _, event_id, event_date, people_count in orders:
+        sold[event_id, event_date] = sold.get((event_id, event_date), 0) + people_count
+    EventSlot.objects.bulk_create(
+        [EventSlot(event_id=event_id, starts_at=starts_at, sold=seats) for (event_id, starts_at), seats in sold.items()],
+        batch_size=1000,
+    )
+    slots = {(slot.event_id, slot.starts_at): slot.pk for slot in EventSlot.objects.all()}
+    now = timezone.now()
+    SeatHold.objects.bulk_create(
+        [SeatHold(order_id=pk, slot_id=slots[event_id, event_date], seats=people_count, status='sold', expires_at=now)
+         for pk, event_id, event_date, people_count in orders],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0016_review_list_indexes'),
+        ('orders', '0004_email_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('starts_at', models.DateTimeField()),
+                ('held', models.IntegerField(default=0)),
+                ('sold', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='services.event')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SeatHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seats', models.IntegerField()),
+                ('status', models.CharField(choices=[('held', 'Held'), ('sold', 'Sold'), ('released', 'Released')], default='held', max_length=20)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='seat_hold', to='orders.order')),
+                ('slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='orders.eventslot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='orders_seathold_due')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='eventslot',
+            constraint=models.UniqueConstraint(fields=('event', 'starts_at'), name='orders_eventslot_event_start'),
+        ),
+        migrations.RunPython(fill_slots, migrations.RunPython.noop),
+    ]
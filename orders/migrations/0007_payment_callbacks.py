@@ -0,0 +1,30 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentCallback',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bog_order_id', models.CharField(max_length=100)),
+                ('bog_status', models.CharField(max_length=30)),
+                ('payload', models.JSONField()),
+                ('applied', models.BooleanField(default=False)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payment_callbacks', to='orders.order')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='paymentcallback',
+            constraint=models.UniqueConstraint(fields=('bog_order_id', 'bog_status'), name='orders_paymentcallback_unique'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_payment_callbacks'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('paid', 'Paid'), ('failed', 'Failed'), ('blocked', 'Blocked'), ('auth_requested', 'Authorization Requested'), ('partial_paid', 'Partial Paid'), ('refund_requested', 'Refund Requested'), ('partial_refunded', 'Partially Refunded'), ('refunded', 'Refunded')], default='pending', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('paid', 'Paid'), ('failed', 'Failed'), ('blocked', 'Blocked'), ('auth_requested', 'Authorization Requested'), ('partial_paid', 'Partial Paid'), ('refund_requested', 'Refund Requested'), ('partial_refunded', 'Partially Refunded'), ('refunded', 'Refunded')], default='pending', max_length=30),
+        ),
+    ]
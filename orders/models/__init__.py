@@ -1,2 +1,5 @@
 from .order import Order, OrderAgePrice
-from .payment import Payment
\ No newline at end of file
+from .payment import Payment, PaymentCallback
+from .email import EmailJob
+from .capacity import EventSlot, SeatHold
+from .idempotency import IdempotencyKey
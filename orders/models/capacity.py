@@ -0,0 +1,55 @@
+from django.db import models
+from orders.models import Order
+from services.models import Event
+
+
+class EventSlot(models.Model):
+    """Seats taken for one event at one date/time (Order.event_date).
+
+    `held` counts seats of unpaid orders whose hold is live, `sold` those of
+    paid orders. Both only move through conditional UPDATEs in
+    orders/capacity.py; held + sold never exceeds Event.max_people.
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='slots')
+    starts_at = models.DateTimeField()
+    held = models.IntegerField(default=0)
+    sold = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'starts_at'], name='orders_eventslot_event_start'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} @ {self.starts_at}: {self.sold} sold, {self.held} held"
+
+
+class SeatHold(models.Model):
+    """The seats one order takes from its slot, and how it holds them."""
+    HELD = 'held'
+    SOLD = 'sold'
+    RELEASED = 'released'
+
+    STATUS_CHOICES = [
+        (HELD, 'Held'),
+        (SOLD, 'Sold'),
+        (RELEASED, 'Released'),
+    ]
+
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name='seat_hold')
+    slot = models.ForeignKey(EventSlot, on_delete=models.CASCADE, related_name='holds')
+    seats = models.IntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=HELD)
+    expires_at = models.DateTimeField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='orders_seathold_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.seats} seats for {self.order_id} ({self.status})"
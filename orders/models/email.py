@@ -0,0 +1,47 @@
+from django.db import models
+from orders.models import Order
+
+
+class EmailJob(models.Model):
+    """Outbox row for a transactional email, sent by the `send_emails` worker."""
+    KIND_CHOICES = [
+        ('customer', 'Customer confirmation'),
+        ('vendor', 'Vendor notification'),
+        ('admin', 'Admin notification'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='email_jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    # Per-recipient template overrides (heading, intro, hero_eyebrow).
+    context = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # BOG retries callbacks; each email is queued at most once per order.
+            models.UniqueConstraint(fields=['order', 'kind'], name='orders_emailjob_order_kind'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='orders_emailjob_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} email for {self.order.order_number} ({self.status})"
@@ -0,0 +1,33 @@
+from django.db import models
+from rest_framework.utils.encoders import JSONEncoder
+from customer.models import Customer
+
+
+class IdempotencyKey(models.Model):
+    """A customer request sent with an Idempotency-Key header, and the
+    response retries with the same key get back (orders/idempotency.py)."""
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='idempotency_keys')
+    scope = models.CharField(max_length=50)
+    key = models.CharField(max_length=255)
+    # SHA-256 of the request body the key was first used with.
+    fingerprint = models.CharField(max_length=64)
+
+    # Both null while the first request is still running.
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    # Encoded like DRF's JSON renderer, so a replay renders the same.
+    response = models.JSONField(null=True, blank=True, encoder=JSONEncoder)
+
+    started_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            # Concurrent retries race on this; exactly one gets to run.
+            models.UniqueConstraint(fields=['customer', 'scope', 'key'], name='orders_idempotencykey_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='orders_idempotencykey_expiry'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key} ({self.status_code or 'running'})"
@@ -13,10 +13,17 @@ _ORDER_NUMBER_ALPHABET = ''.join(
 
 
 class Order(models.Model):
+    # Every status a BOG callback can set (orders/callbacks.py STATUS_MAP).
     STATUS_CHOICES = [
         ('pending', 'Pending'),
+        ('processing', 'Processing'),
         ('paid', 'Paid'),
         ('failed', 'Failed'),
+        ('blocked', 'Blocked'),
+        ('auth_requested', 'Authorization Requested'),
+        ('partial_paid', 'Partial Paid'),
+        ('refund_requested', 'Refund Requested'),
+        ('partial_refunded', 'Partially Refunded'),
         ('refunded', 'Refunded'),
     ]
 
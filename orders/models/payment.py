@@ -25,6 +25,7 @@ class Payment(models.Model):
         ('auth_requested', 'Authorization Requested'),
         ('partial_paid', 'Partial Paid'),
         ('refund_requested', 'Refund Requested'),
+        ('partial_refunded', 'Partially Refunded'),
         ('refunded', 'Refunded'),
     ]
 
@@ -58,3 +59,23 @@ class Payment(models.Model):
 
     def __str__(self):
         return f"Payment for {self.order.order_number}"
+
+
+class PaymentCallback(models.Model):
+    """A verified BOG callback, kept as received. BOG redelivers callbacks;
+    the unique (bog_order_id, bog_status) pair is how repeats are spotted."""
+    bog_order_id = models.CharField(max_length=100)
+    bog_status = models.CharField(max_length=30)
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='payment_callbacks')
+    payload = models.JSONField()
+    # False when it arrived after a later status and changed nothing.
+    applied = models.BooleanField(default=False)
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['bog_order_id', 'bog_status'], name='orders_paymentcallback_unique'),
+        ]
+
+    def __str__(self):
+        return f"BOG {self.bog_order_id} {self.bog_status}"
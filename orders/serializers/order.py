@@ -1,8 +1,12 @@
+from django.db import transaction
+from django.db.models import F, Q
 from rest_framework import serializers
-from services.models import Event, EventAgePrice
+from services.models import Event, Discount
+from services.pricing import get_pricing_plan, INFANT, CHILD
 from services.serializers.event import EventListSerializer
 from panel.serializers.admin import AdminSerializer
 from ..models import Order, OrderAgePrice
+from .. import capacity
 from decimal import Decimal
 
 class OrderAgePriceSerializer(serializers.ModelSerializer):
@@ -37,52 +41,34 @@ class OrderCreateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         event = validated_data['event']
+        plan = get_pricing_plan(event)
         age_prices_data = validated_data.pop('age_prices', None)
-
-        if age_prices_data:
-            people_count = 0
-            adults_count = 0
-            children_count = 0
-            infants_count = 0
-            
-            for item in age_prices_data:
-                try:
-                    ap = event.age_prices.get(id=item['age_price_id'])
-                except EventAgePrice.DoesNotExist:
-                    raise serializers.ValidationError({"age_prices": f"Age price category with ID {item['age_price_id']} not found."})
-                
-                qty = item['quantity']
-                people_count += qty
-                if ap.max_age <= 2:
-                    infants_count += qty
-                elif ap.max_age <= 12:
-                    children_count += qty
-                else:
-                    adults_count += qty
-            
         event_date = validated_data.get('event_date')
+
+        line_items = []
         if age_prices_data:
             people_count = 0
             adults_count = 0
             children_count = 0
             infants_count = 0
-            
+
             for item in age_prices_data:
-                try:
-                    ap = event.age_prices.get(id=item['age_price_id'])
-                except EventAgePrice.DoesNotExist:
+                ap = plan.age_price(item['age_price_id'])
+                if ap is None:
                     raise serializers.ValidationError({"age_prices": f"Age price category with ID {item['age_price_id']} not found."})
-                
+
                 qty = item['quantity']
+                line_items.append((ap, qty))
                 people_count += qty
-                if ap.max_age <= 2:
+                group = plan.age_group(ap.id)
+                if group == INFANT:
                     infants_count += qty
-                elif ap.max_age <= 12:
+                elif group == CHILD:
                     children_count += qty
                 else:
                     adults_count += qty
-            
-            base_price = event.calculate_price(age_prices_data=age_prices_data, event_date=event_date)
+
+            base_price = plan.price(age_prices_data=age_prices_data, event_date=event_date)
         else:
             people_count = validated_data.get('people_count')
             adults_count = validated_data.get('adults_count', 0)
@@ -97,7 +83,7 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             else:
                 people_count = adults_count + children_count + infants_count
             
-            base_price = event.calculate_price(people_count, adults_count, children_count, infants_count, event_date=event_date)
+            base_price = plan.price(people_count, adults_count, children_count, infants_count, event_date=event_date)
 
         validated_data['people_count'] = people_count
         validated_data['adults_count'] = adults_count
@@ -115,46 +101,64 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         validated_data['customer_country'] = getattr(customer, 'country', '')
         validated_data['event_ticket'] = event.event_ticket
 
-        discount_amount = Decimal('0.00')
-        active_discount = event.discounts.filter(is_active=True).first()
-        if active_discount and active_discount.is_valid():
-            if active_discount.discount_type == 'percentage':
-                discount_amount = base_price * (active_discount.discount_value / 100)
-            else:
-                discount_amount = min(active_discount.discount_value, base_price)
-
-        total_price = base_price - discount_amount
-        commission_amount = total_price * (event.company.commission_rate / 100)
-
-        order = Order.objects.create(
-            customer=customer,
-            base_price=base_price,
-            discount_amount=discount_amount,
-            total_price=total_price,
-            commission_amount=commission_amount,
-            **validated_data
-        )
-
-        if age_prices_data:
-            for item in age_prices_data:
-                ap = event.age_prices.get(id=item['age_price_id'])
-                OrderAgePrice.objects.create(
+        with transaction.atomic():
+            # Claim a use of the discount with a conditional UPDATE so
+            # concurrent checkouts can never push used_count past max_uses;
+            # losing the race just prices the order without it.
+            active_discount = event.get_active_discount()
+            if active_discount is not None:
+                claimed = Discount.objects.filter(
+                    Q(max_uses__isnull=True) | Q(used_count__lt=F('max_uses')),
+                    pk=active_discount.pk,
+                    is_active=True,
+                ).update(used_count=F('used_count') + 1)
+                if not claimed:
+                    active_discount = None
+
+            discount_amount = Decimal('0.00')
+            if active_discount is not None:
+                if active_discount.discount_type == 'percentage':
+                    discount_amount = base_price * (active_discount.discount_value / 100)
+                else:
+                    discount_amount = min(active_discount.discount_value, base_price)
+
+            total_price = base_price - discount_amount
+            commission_amount = total_price * (event.company.commission_rate / 100)
+
+            order = Order.objects.create(
+                customer=customer,
+                base_price=base_price,
+                discount_amount=discount_amount,
+                total_price=total_price,
+                commission_amount=commission_amount,
+                **validated_data
+            )
+
+            # One conditional UPDATE on this slot's counter row; a full
+            # slot rolls the whole order back, discount use included.
+            try:
+                capacity.hold_seats(order)
+            except capacity.SlotFull as e:
+                message = f"Only {e.seats_left} seats left for this date." if e.seats_left else "This date is sold out."
+                raise serializers.ValidationError({"event_date": message})
+
+            OrderAgePrice.objects.bulk_create([
+                OrderAgePrice(
                     order=order,
                     category_name=ap.category_name,
                     min_age=ap.min_age,
                     max_age=ap.max_age,
                     price=ap.price,
-                    quantity=item['quantity'],
+                    quantity=qty,
                     start_time=ap.start_time,
                     end_time=ap.end_time
                 )
+                for ap, qty in line_items
+            ])
 
-        if active_discount:
-            active_discount.used_count += 1
-            active_discount.save()
-
-        event.bookings_count += 1
-        event.save()
+            # Counter-only UPDATE: no lost increments under concurrent
+            # checkouts, and no post_save, so the catalog cache stays warm.
+            Event.objects.filter(pk=event.pk).update(bookings_count=F('bookings_count') + 1)
 
         return order
 
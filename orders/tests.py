@@ -0,0 +1,231 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from customer.models import Customer
+from services.models import Category, City, Country, Event
+from staff.models import Company
+
+from . import callbacks, capacity
+from .idempotency import idempotent
+from .models import EventSlot, IdempotencyKey, Order, Payment, SeatHold
+
+
+@override_settings(SENDGRID_API_KEY='', SEAT_HOLD_SWEEP_INTERVAL=0)
+class OrderTestCase(TestCase):
+    """An event with 5 seats and one order holding 2 of them."""
+
+    def setUp(self):
+        country = Country.objects.create(name='Georgia')
+        city = City.objects.create(name='Tbilisi', country=country)
+        company = Company.objects.create(name='Acme', founded_year=2000, ceo='ceo', identity_number='1',
+                                         commission_rate=Decimal('10'))
+        category = Category.objects.create(name='Tours', activity='land')
+        self.event = Event.objects.create(company=company, category=category, city=city, name='Tour',
+                                          description='desc', base_price=Decimal('100'),
+                                          price_per_person=Decimal('0'), max_people=5)
+        self.customer = Customer.objects.create(firstname='a', lastname='b', country='GE', mobile='1',
+                                                email='c@example.com', password='pw')
+        self.event_date = timezone.now() + timedelta(days=3)
+        self.order = self.make_order(2)
+        capacity.hold_seats(self.order)
+
+    def make_order(self, people_count):
+        return Order.objects.create(
+            customer=self.customer, event=self.event, customer_name='a b', customer_email='c@example.com',
+            customer_phone='1', customer_country='GE', people_count=people_count,
+            event_date=self.event_date,
+            base_price=Decimal('100'), total_price=Decimal('100'), commission_amount=Decimal('10'),
+        )
+
+    def seats(self):
+        slot = EventSlot.objects.get()
+        return slot.held, slot.sold
+
+
+class PaymentCallbackRefundTests(OrderTestCase):
+
+    def callback(self, bog_status, amount='100'):
+        return callbacks.ingest({'body': {
+            'order_id': 'bog-1',
+            'external_order_id': self.order.order_number,
+            'order_status': {'key': bog_status},
+            'purchase_units': {'transfer_amount': amount},
+        }})
+
+    def test_full_refund_after_partial_refund(self):
+        self.assertEqual(self.callback('completed'), callbacks.APPLIED)
+        self.assertEqual(self.seats(), (0, 2))
+
+        self.assertEqual(self.callback('refunded_partially', '40'), callbacks.APPLIED)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'partial_refunded')
+        self.assertEqual(self.order.get_status_display(), 'Partially Refunded')
+        self.assertEqual(Payment.objects.get(order=self.order).status, 'partial_refunded')
+        # A partial refund keeps the booking.
+        self.assertEqual(self.seats(), (0, 2))
+
+        self.assertEqual(self.callback('refunded'), callbacks.APPLIED)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'refunded')
+        self.assertEqual(Payment.objects.get(order=self.order).status, 'refunded')
+        self.assertEqual(SeatHold.objects.get(order=self.order).status, SeatHold.RELEASED)
+        self.assertEqual(self.seats(), (0, 0))
+
+    def test_partial_refund_after_full_refund_is_stale(self):
+        self.callback('completed')
+        self.callback('refunded')
+        self.assertEqual(self.callback('refunded_partially', '40'), callbacks.STALE)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'refunded')
+
+    def test_repeated_callback_is_a_duplicate(self):
+        self.callback('completed')
+        self.assertEqual(self.callback('completed'), callbacks.DUPLICATE)
+
+
+class SeatCapacityTests(OrderTestCase):
+    def hold(self, order=None):
+        return SeatHold.objects.get(order=order or self.order)
+
+    def lapse(self, order=None):
+        SeatHold.objects.filter(order=order or self.order).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_hold_seats_raises_when_slot_is_full(self):
+        with self.assertRaises(capacity.SlotFull) as raised:
+            capacity.hold_seats(self.make_order(4))
+        self.assertEqual(raised.exception.seats_left, 3)
+        self.assertEqual(self.seats(), (2, 0))
+
+    def test_full_slot_reclaims_lapsed_holds(self):
+        self.lapse()
+        other = self.make_order(4)
+        capacity.hold_seats(other)
+        self.assertEqual(self.hold().status, SeatHold.RELEASED)
+        self.assertEqual(self.hold(other).status, SeatHold.HELD)
+        self.assertEqual(self.seats(), (4, 0))
+
+    def test_renew_hold_takes_released_seats_again(self):
+        capacity.release_seats(self.order)
+        self.assertEqual(self.seats(), (0, 0))
+        capacity.renew_hold(self.order)
+        self.assertEqual(self.hold().status, SeatHold.HELD)
+        self.assertGreater(self.hold().expires_at, timezone.now())
+        self.assertEqual(self.seats(), (2, 0))
+
+    def test_renew_hold_raises_when_released_seats_are_gone(self):
+        capacity.release_seats(self.order)
+        capacity.hold_seats(self.make_order(4))
+        with self.assertRaises(capacity.SlotFull):
+            capacity.renew_hold(self.order)
+        self.assertEqual(self.hold().status, SeatHold.RELEASED)
+        self.assertEqual(self.seats(), (4, 0))
+
+    def test_confirm_and_release_are_idempotent(self):
+        capacity.confirm_seats(self.order)
+        capacity.confirm_seats(self.order)
+        self.assertEqual(self.hold().status, SeatHold.SOLD)
+        self.assertEqual(self.seats(), (0, 2))
+        capacity.release_seats(self.order)
+        capacity.release_seats(self.order)
+        self.assertEqual(self.hold().status, SeatHold.RELEASED)
+        self.assertEqual(self.seats(), (0, 0))
+
+    def test_release_expired_holds_leaves_renewed_hold_alone(self):
+        self.lapse()
+        capacity.renew_hold(self.order)
+        self.assertEqual(capacity.release_expired_holds(), 0)
+        self.assertEqual(self.hold().status, SeatHold.HELD)
+        self.assertEqual(self.seats(), (2, 0))
+
+    def test_release_expired_holds_skips_hold_renewed_after_it_was_read(self):
+        self.lapse()
+        transition = capacity._transition
+
+        def renew_first(hold, *args, **kwargs):
+            # A checkout renews the hold between the sweep's read and its update.
+            capacity.renew_hold(self.order)
+            return transition(hold, *args, **kwargs)
+
+        with mock.patch.object(capacity, '_transition', renew_first):
+            self.assertEqual(capacity.release_expired_holds(), 0)
+        self.assertEqual(self.hold().status, SeatHold.HELD)
+        self.assertEqual(self.seats(), (2, 0))
+
+
+class IdempotentView(APIView):
+    authentication_classes = []
+    permission_classes = []
+    respond = None
+
+    @idempotent('test')
+    def post(self, request):
+        return self.respond(request)
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(firstname='a', lastname='b', country='GE', mobile='1',
+                                                email='c@example.com', password='pw')
+        self.calls = 0
+        self.factory = APIRequestFactory()
+
+    def post(self, respond, body=None, key='k1'):
+        request = self.factory.post('/orders', body or {'people_count': 2}, format='json',
+                                    HTTP_IDEMPOTENCY_KEY=key)
+        request.customer = self.customer
+        return IdempotentView.as_view(respond=respond)(request)
+
+    def created(self, request):
+        self.calls += 1
+        return Response({'order': self.calls, 'total': Decimal('10.50')}, status=201)
+
+    def test_retry_replays_stored_response(self):
+        first = self.post(self.created)
+        second = self.post(self.created)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.render().content, first.render().content)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertFalse(first.has_header('Idempotent-Replayed'))
+
+    def test_same_key_with_different_body_is_rejected(self):
+        self.post(self.created)
+        response = self.post(self.created, body={'people_count': 3})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.calls, 1)
+
+    def test_retry_while_first_request_runs_conflicts(self):
+        retries = []
+
+        def slow(request):
+            retries.append(self.post(self.created))
+            return self.created(request)
+
+        self.post(slow)
+        self.assertEqual(retries[0].status_code, 409)
+        self.assertEqual(retries[0]['Retry-After'], '1')
+        self.assertEqual(self.calls, 1)
+
+    def test_exception_frees_the_key(self):
+        def fail(request):
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            self.post(fail)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self.post(self.created).status_code, 201)
+        self.assertEqual(self.calls, 1)
+
+    def test_server_error_frees_the_key(self):
+        response = self.post(lambda request: Response({'error': 'down'}, status=503))
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self.post(self.created).status_code, 201)
+        self.assertEqual(self.calls, 1)
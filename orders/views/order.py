@@ -4,12 +4,15 @@ from rest_framework import generics
 from customer.permissions import IsCustomerAuthenticated
 from customer.middleware import CustomerSessionMiddleware
 from rest_framework.response import Response
+from core.pagination import CreatedAtCursorPagination
+from ..idempotency import idempotent
 
 class OrderCreateView(generics.CreateAPIView):
     serializer_class = OrderCreateSerializer
     permission_classes = [IsCustomerAuthenticated]
     authentication_classes = [CustomerSessionMiddleware]
 
+    @idempotent('order-create')
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -23,6 +26,7 @@ class OrderListView(generics.ListAPIView):
     serializer_class = OrderSerializer
     permission_classes = [IsCustomerAuthenticated]
     authentication_classes = [CustomerSessionMiddleware]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         user = self.request.customer
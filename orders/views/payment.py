@@ -1,14 +1,13 @@
 import base64
+import functools
 import json
 import logging
 import uuid
-from decimal import Decimal
 
 import requests
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding
 from django.conf import settings
-from django.template.loader import render_to_string
 from rest_framework import permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -17,9 +16,9 @@ from customer.middleware import CustomerSessionMiddleware
 from orders.models import Order
 from ..models.payment import Payment, PAYMENT_METHODS
 from ..serializers.payment import PaymentSerializer
+from .. import bog, callbacks, capacity
+from ..idempotency import idempotent
 
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
 
 logger = logging.getLogger("orders.payment")
 
@@ -97,27 +96,21 @@ def _normalize_apple_pay_token(raw):
             return json.dumps(raw, separators=(",", ":"))
     return None
 
+
+def _bog_idempotency_key(order, client_key):
+    """A retry the client marks as such (same Idempotency-Key) also reuses
+    BOG's key, so BOG returns the session it already opened for it."""
+    if not client_key:
+        return str(uuid.uuid4())
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{order.order_number}:{client_key}"))
+
+
 # -------------------------------
 # BOG Authentication
 # -------------------------------
 def get_bog_access_token(client_id, client_secret):
-    url = "https://oauth2.bog.ge/auth/realms/bog/protocol/openid-connect/token"
-    auth_str = f"{client_id}:{client_secret}"
-    base64_auth = base64.b64encode(auth_str.encode()).decode()
-
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Authorization": f"Basic {base64_auth}",
-    }
-
-    data = {"grant_type": "client_credentials"}
-
-    response = requests.post(url, headers=headers, data=data, timeout=10)
-    if response.status_code == 200:
-        return response.json()["access_token"]
-    logger.error("BOG token request failed status=%s body=%s",
-                 response.status_code, (response.text or "")[:500])
-    raise RuntimeError(f"Failed to get BOG token (status {response.status_code})")
+    # Cached per process until shortly before expiry; see orders.bog.
+    return bog.get_access_token(client_id, client_secret)
 
 
 # -------------------------------
@@ -127,6 +120,7 @@ class BOGInitiatePaymentView(APIView):
     permission_classes = [IsCustomerAuthenticated]
     authentication_classes = [CustomerSessionMiddleware]
 
+    @idempotent("payment-initiate")
     def post(self, request):
         order_number = request.data.get("order_number")
         method = request.data.get("method")
@@ -148,6 +142,11 @@ class BOGInitiatePaymentView(APIView):
         if order.status == "paid":
             return Response({"error": "Order already paid."}, status=400)
 
+        try:
+            capacity.renew_hold(order)
+        except capacity.SlotFull:
+            return Response({"error": "The seats for this order are no longer available."}, status=409)
+
         # Get access token
         try:
             token = get_bog_access_token(settings.BOG_PUBLIC_KEY, settings.BOG_SECRET_KEY)
@@ -198,11 +197,12 @@ class BOGInitiatePaymentView(APIView):
             "Content-Type": "application/json",
             "Authorization": f"Bearer {token}",
             "Accept-Language": "ka",
-            "Idempotency-Key": str(uuid.uuid4()),
+            "Idempotency-Key": _bog_idempotency_key(order, request.idempotency_key),
         }
 
         try:
-            response = requests.post(
+            response = bog.request(
+                "post",
                 f"{settings.BOG_BASE_URL}/payments/v1/ecommerce/orders",
                 json=payload,
                 headers=headers,
@@ -295,6 +295,11 @@ class BOGGooglePayInitiateView(APIView):
         if order.status == "paid":
             return Response({"error": "Order already paid."}, status=400)
 
+        try:
+            capacity.renew_hold(order)
+        except capacity.SlotFull:
+            return Response({"error": "The seats for this order are no longer available."}, status=409)
+
         try:
             token = get_bog_access_token(settings.BOG_PUBLIC_KEY, settings.BOG_SECRET_KEY)
         except Exception as e:
@@ -347,7 +352,8 @@ class BOGGooglePayInitiateView(APIView):
         }
 
         try:
-            response = requests.post(
+            response = bog.request(
+                "post",
                 f"{settings.BOG_BASE_URL}/payments/v1/ecommerce/orders",
                 json=payload,
                 headers=headers,
@@ -476,6 +482,11 @@ class BOGApplePayInitiateView(APIView):
         if order.status == "paid":
             return Response({"error": "Order already paid."}, status=400)
 
+        try:
+            capacity.renew_hold(order)
+        except capacity.SlotFull:
+            return Response({"error": "The seats for this order are no longer available."}, status=409)
+
         try:
             token = get_bog_access_token(settings.BOG_PUBLIC_KEY, settings.BOG_SECRET_KEY)
         except Exception as e:
@@ -527,7 +538,8 @@ class BOGApplePayInitiateView(APIView):
         }
 
         try:
-            create_response = requests.post(
+            create_response = bog.request(
+                "post",
                 f"{settings.BOG_BASE_URL}/payments/v1/ecommerce/orders",
                 json=create_payload,
                 headers={**common_headers, "Idempotency-Key": str(uuid.uuid4())},
@@ -559,7 +571,8 @@ class BOGApplePayInitiateView(APIView):
 
         # --- Step 2: attach the encrypted Apple Pay token ---
         try:
-            complete_response = requests.post(
+            complete_response = bog.request(
+                "post",
                 f"{settings.BOG_BASE_URL}/payments/v1/ecommerce/orders/{bog_order_id}/payment",
                 json={"apple_pay_token": apple_pay_token},
                 headers={**common_headers, "Idempotency-Key": str(uuid.uuid4())},
@@ -649,16 +662,20 @@ PwIDAQAB
 # -------------------------------
 # CALLBACK FROM BOG
 # -------------------------------
+@functools.lru_cache(maxsize=None)
+def _bog_callback_key():
+    # Parsed once per process; callbacks arrive in bursts.
+    return serialization.load_pem_public_key(BOG_PUBLIC_KEY_PEM.encode())
+
+
 class BOGPaymentCallbackView(APIView):
     authentication_classes = []
     permission_classes = [permissions.AllowAny]
 
     def verify_signature(self, raw_body, signature_base64):
-        public_key_pem = BOG_PUBLIC_KEY_PEM
         try:
             signature = base64.b64decode(signature_base64)
-            public_key = serialization.load_pem_public_key(public_key_pem.encode())
-            public_key.verify(
+            _bog_callback_key().verify(
                 signature,
                 raw_body,
                 padding.PKCS1v15(),
@@ -669,153 +686,6 @@ class BOGPaymentCallbackView(APIView):
             logger.warning("BOG callback signature verification failed.", exc_info=True)
             return False
 
-    def _build_email_context(self, order: Order):
-        """Shared context for the order_confirmation.html template."""
-        currency = getattr(order, "currency", "GEL")
-        event = getattr(order, "event", None)
-        ticket_type = event.event_ticket if event and event.event_ticket else (event.category.activity if event else "Unknown")
-        event_name = event.name if event else "N/A"
-    
-        # Primary event image → absolute URL (blank if none).
-        hero_image_url = ""
-        if event is not None:
-            primary = event.images.filter(is_primary=True).first()
-            if primary and primary.image:
-                try:
-                    rel = primary.image.url
-                except ValueError:
-                    rel = ""
-                if rel:
-                    if rel.startswith("http://") or rel.startswith("https://"):
-                        hero_image_url = rel
-                    else:
-                        site = getattr(settings, "SITE_URL", "https://funfinder.ge").rstrip("/")
-                        hero_image_url = f"{site}{rel}"
-
-        location_name = ""
-        location_address = ""
-        if event is not None:
-            location_name = getattr(getattr(event, "city", None), "name", "") or ""
-            location_address = getattr(event, "location", "") or ""
-
-        event_datetime = ""
-        if getattr(order, "event_date", None):
-            event_datetime = order.event_date.strftime("%A<br>%B %d, %Y<br>%I:%M %p")
-
-        order_year = order.created_at.year if getattr(order, "created_at", None) else 2026
-
-        return {
-            "customer_name": order.customer_name,
-            "event_name": event_name,
-            "artist_line": event_name,
-            "location_name": location_name,
-            "location_address": location_address,
-            "event_datetime": event_datetime,
-            "ticket_type": ticket_type,
-            "quantity": str(order.people_count),
-            "price": f"{order.total_price} {currency}",
-            "ticket_id": order.order_number,
-            "ticket_url": f"https://funfinder.ge/orders/{order.order_number}",
-            "hero_image_url": hero_image_url,
-            "year": str(order_year),
-        }
-
-    def _send_template_email(self, sg, sender_email, to_email, subject, ctx_overrides, base_ctx):
-        ctx = {**base_ctx, **ctx_overrides, "subject": subject}
-        html = render_to_string("email/order_confirmation.html", ctx)
-        msg = Mail(
-            from_email=sender_email,
-            to_emails=to_email,
-            subject=subject,
-            html_content=html,
-        )
-        sg.send(msg)
-
-    def send_success_email(self, order: Order):
-        if not settings.SENDGRID_API_KEY:
-            logger.info("SendGrid API Key not set, skipping email for order %s.",
-                        order.order_number)
-            return
-
-        sg = SendGridAPIClient(settings.SENDGRID_API_KEY)
-        sender_email = settings.SENDGRID_EMAIL_SENDER
-
-        base_ctx = self._build_email_context(order)
-        event_name = base_ctx["event_name"]
-        company_name = (
-            order.event.company.name
-            if getattr(order, "event", None) and getattr(order.event, "company", None)
-            else "Unknown Company"
-        )
-
-        # Customer email
-        try:
-            self._send_template_email(
-                sg,
-                sender_email,
-                order.customer_email,
-                f"Your FunFinder ticket — {event_name}",
-                {
-                    "heading": "Order confirmation",
-                    "intro": f"Thank you for your purchase, {order.customer_name}! Please save or print your ticket before the event.",
-                    "hero_eyebrow": "Order confirmed",
-                },
-                base_ctx,
-            )
-        except Exception:
-            logger.exception("Failed to send Customer email for order %s",
-                             order.order_number)
-
-        # Vendor/company email — recipient is configured via env so we don't
-        # ship an internal address in source. Falls back to the company's own
-        # email on the event when the override is not set.
-        vendor_email = getattr(settings, "FUNFINDER_VENDOR_NOTIFICATION_EMAIL", "") or (
-            order.event.company.email
-            if getattr(order, "event", None) and getattr(order.event, "company", None)
-            else ""
-        )
-        if vendor_email:
-            try:
-                self._send_template_email(
-                    sg,
-                    sender_email,
-                    vendor_email,
-                    f"New booking — {event_name}",
-                    {
-                        "heading": "New booking received",
-                        "intro": f"Hello {company_name}, you have a new paid booking from {order.customer_name} via FunFinder.",
-                        "hero_eyebrow": "New booking",
-                    },
-                    base_ctx,
-                )
-            except Exception:
-                logger.exception("Failed to send Company email for order %s",
-                                 order.order_number)
-
-        # Admin email — recipient configured via env (FUNFINDER_ADMIN_EMAIL).
-        admin_email = getattr(settings, "FUNFINDER_ADMIN_EMAIL", "")
-        if admin_email:
-            try:
-                self._send_template_email(
-                    sg,
-                    sender_email,
-                    admin_email,
-                    f"[ADMIN] New transaction #{order.order_number}",
-                    {
-                        "heading": "New transaction",
-                        "intro": f"Payment processed for {order.customer_name} ({order.customer_email}) — vendor: {company_name}.",
-                        "hero_eyebrow": "Admin alert",
-                    },
-                    base_ctx,
-                )
-                logger.info("All emails processed for Order #%s", order.order_number)
-            except Exception:
-                logger.exception("Failed to send Admin email for order %s",
-                                 order.order_number)
-        else:
-            logger.info("FUNFINDER_ADMIN_EMAIL not configured; skipping admin email "
-                        "for order %s.", order.order_number)
-            
     def post(self, request, *args, **kwargs):
         raw_body = request.body
         callback_signature = request.headers.get("Callback-Signature")
@@ -834,72 +704,16 @@ class BOGPaymentCallbackView(APIView):
             logger.warning("BOG callback: invalid JSON body received.")
             return Response({"error": "Invalid JSON"}, status=400)
 
-        body = data.get("body", {})
-        logger.info("BOG callback received: %s", body)
-
-        external_order_id = body.get("external_order_id") or body.get("order_id")
-
-        if not external_order_id:
+        body = data.get("body", {}) or {}
+        if not (body.get("external_order_id") or body.get("order_id")):
             return Response({"error": "Order ID missing"}, status=400)
 
-        try:
-            order = Order.objects.get(order_number=external_order_id)
-        except Order.DoesNotExist:
+        outcome = callbacks.ingest(data)
+        logger.info("BOG callback %s: %s", outcome, body)
+        if outcome == callbacks.UNKNOWN_ORDER:
             return Response({"error": "Order not found"}, status=404)
-
-        payment_detail = body.get("payment_detail", {})
-        transaction_id = payment_detail.get("transaction_id", "")
-
-        purchase_units = body.get("purchase_units", {}) or {}
-        transfer_amount = purchase_units.get("transfer_amount") or "0"
-        amount = Decimal(transfer_amount)
-
-        bog_status = body.get("order_status", {}).get("key", "pending")
-
-        status_map = {
-            "completed": "paid",
-            "processing": "processing",
-            "created": "pending",
-            "rejected": "failed",
-            "refund_requested": "refund_requested",
-            "refunded": "refunded",
-            "refunded_partially": "refunded",
-            "partial_completed": "partial_paid",
-            "blocked": "blocked",
-            "auth_requested": "auth_requested",
-        }
-
-        internal_status = status_map.get(bog_status, "pending")
-
-        if internal_status == "paid" and order.status != "paid":
-            self.send_success_email(order)
-
-        order.status = internal_status
-        order.save()
-
-        method_key = payment_detail.get("transfer_method", {}).get("key", "")
-        card_type = payment_detail.get("card_type", "")
-        payer_identifier = payment_detail.get("payer_identifier", "")
-        result_code = payment_detail.get("code", "")
-        result_message = payment_detail.get("code_description", "")
-
-        Payment.objects.update_or_create(
-            order=order,
-            defaults={
-                "payment_method": method_key or "card",
-                "amount": amount,
-                "requested_amount": order.total_price,
-                "currency": getattr(order, "currency", "GEL"),
-                "transaction_id": transaction_id,
-                "status": internal_status,
-                "method_provider": method_key,
-                "card_type": card_type,
-                "payer_identifier": payer_identifier,
-                "result_code": result_code,
-                "result_message": result_message,
-                "payment_gateway_response": data,
-            },
-        )
+        if outcome == callbacks.DUPLICATE:
+            return Response({"message": "Callback already received"}, status=200)
 
         return Response({"message": "Callback processed"}, status=200)
 
@@ -936,7 +750,8 @@ class BOGPaymentStatusView(APIView):
         }
 
         try:
-            response = requests.get(
+            response = bog.request(
+                "get",
                 f"{settings.BOG_BASE_URL}/payments/v1/receipt/{order_id}",
                 headers=headers,
                 timeout=10,
@@ -3,4 +3,6 @@ from django.apps import AppConfig
 class PanelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'panel'
-    verbose_name = "Admin"
\ No newline at end of file
+    verbose_name = "Admin"
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.profiling import collect_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = "Print per-endpoint query counts and timings recorded by REQUEST_PROFILING."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sort", default="queries_avg",
+                            help="Column to sort by, descending (default: queries_avg).")
+        parser.add_argument("--json", action="store_true", help="Dump the raw report as JSON.")
+        parser.add_argument("--reset", action="store_true", help="Clear the stats after printing.")
+
+    def handle(self, *args, **options):
+        report = collect_stats()
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+        else:
+            self.stdout.write(
+                f"{'endpoint':<40} {'reqs':>6} {'q avg':>7} {'q p95':>6} {'q max':>6} "
+                f"{'sql ms':>8} {'ser ms':>8} {'p95 ms':>7} {'kB avg':>8} {'over':>5}"
+            )
+            rows = sorted(report.items(), key=lambda item: item[1].get(options["sort"], 0), reverse=True)
+            for endpoint, stats in rows:
+                self.stdout.write(
+                    f"{endpoint:<40} {stats['requests']:>6} {stats['queries_avg']:>7} "
+                    f"{stats['queries_p95']:>6} {stats['queries_max']:>6} {stats['sql_ms_avg']:>8} "
+                    f"{stats['serializer_ms_avg']:>8} {stats['total_ms_p95']:>7} "
+                    f"{stats['bytes_avg'] / 1024:>8.1f} {stats['over_budget']:>5}"
+                )
+        if options["reset"]:
+            reset_stats()
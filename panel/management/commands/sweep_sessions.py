@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.sessions import sweep_sessions
+
+
+class Command(BaseCommand):
+    help = "Delete expired customer, staff and admin sessions and cap sessions per user."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Rows deleted per query.")
+        parser.add_argument("--max-sessions", type=int, help="Sessions kept per user.")
+
+    def handle(self, *args, **options):
+        report = sweep_sessions(options["batch_size"], options["max_sessions"])
+        for name, stats in report.items():
+            self.stdout.write(
+                f"{name}: {stats['expired']} expired, {stats['capped']} over the cap, "
+                f"{stats['seconds']}s"
+            )
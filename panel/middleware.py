@@ -1,8 +1,11 @@
 from django.utils import timezone
+from core.sessions import SessionResolver
 from .models import AdminSession
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.authentication import BaseAuthentication
 
+admin_sessions = SessionResolver('admin', AdminSession, 'admin')
+
 
 class AdminSessionMiddleware(BaseAuthentication):
     def authenticate(self, request):
@@ -11,9 +14,8 @@ class AdminSessionMiddleware(BaseAuthentication):
         if not session_token:
             return None
 
-        try:
-            session = AdminSession.objects.get(session_token=session_token)
-        except AdminSession.DoesNotExist:
+        session = admin_sessions.resolve(session_token)
+        if session is None:
             raise AuthenticationFailed('Invalid session token')
 
         if session.expires_at <= timezone.now():
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('panel', '0004_remove_slider_description_tr_remove_slider_title_tr_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='adminsession',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
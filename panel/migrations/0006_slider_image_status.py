@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('panel', '0005_session_expires_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slider',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=10),
+        ),
+    ]
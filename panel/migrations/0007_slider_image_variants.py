@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('panel', '0006_slider_image_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slider',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from panel.models.admin import Admin
-from django.db import models
+from django.db import models, transaction
+from services import images
 from services.utils import image_upload
 
 def upload_slider_image(instance, filename):
@@ -11,11 +12,19 @@ class Slider(models.Model):
     title = models.CharField(max_length=255)
     description = models.CharField(max_length=255)
     image = models.ImageField(upload_to=upload_slider_image)
+    image_status = models.CharField(max_length=10, choices=images.IMAGE_STATUS_CHOICES, default=images.READY)
+    image_variants = models.JSONField(default=dict, blank=True)
 
     link = models.URLField(max_length=500, blank=True, null=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            upload = images.prepare_upload(self, 'image')
+            super().save(*args, **kwargs)
+            images.finish_upload(self, 'image', upload)
     
     def __str__(self):
          return f"{self.title} | uploaded by {self.admin.firstname}"
\ No newline at end of file
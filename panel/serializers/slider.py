@@ -6,7 +6,8 @@ class SliderUploadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Slider
-        fields = ['id', 'image', 'title', 'description', 'link']
+        fields = ['id', 'image', 'image_status', 'title', 'description', 'link']
+        read_only_fields = ['image_status']
 
     def create(self, validated_data):
         admin = self.context['admin']
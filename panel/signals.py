@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+
+from core.cache import bump_catalog_version
+from .middleware import admin_sessions
+from .models import Slider
+
+post_save.connect(bump_catalog_version, sender=Slider, dispatch_uid='catalog-save-Slider')
+post_delete.connect(bump_catalog_version, sender=Slider, dispatch_uid='catalog-delete-Slider')
+
+admin_sessions.connect()
@@ -1,10 +1,11 @@
 from django.urls import path
-from ..views.admin import LoginView, ProfileView, LogoutView, AdminCreateView, AdminListView
+from ..views.admin import LoginView, ProfileView, LogoutView, AdminCreateView, AdminListView, ProfilingStatsView
 
 urlpatterns = [
     path('login', LoginView.as_view(), name='login'),
     path('create', AdminCreateView.as_view(), name='admin-create'),
     path('profile', ProfileView.as_view(), name='profile'),
     path('logout', LogoutView.as_view(), name="logout"),
-    path('list', AdminListView.as_view(), name='staff list for admin')
+    path('list', AdminListView.as_view(), name='staff list for admin'),
+    path('profiling', ProfilingStatsView.as_view(), name='admin-profiling'),
 ]
\ No newline at end of file
@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from ..permissions import IsAdminAuthenticated
 from ..serializers.admin import AdminSerializer, AdminLoginSerializer, AdminCreateSerializer
 from ..middleware import AdminSessionMiddleware
+from django.conf import settings
 from django.middleware.csrf import get_token
 import uuid
 from django.utils.timezone import now
@@ -10,6 +11,7 @@ from datetime import timedelta
 from ..models import AdminSession, Admin
 from core.utils import get_client_ip
 from core.permissions import AllowAny
+from core import profiling
 
 class AdminCreateView(generics.GenericAPIView):
     serializer_class = AdminCreateSerializer
@@ -94,4 +96,21 @@ class AdminListView(generics.ListAPIView):
     serializer_class = AdminSerializer
 
     def get_queryset(self):
-        return Admin.objects.exclude(id=self.request.admin.id)
\ No newline at end of file
+        return Admin.objects.exclude(id=self.request.admin.id)
+
+
+class ProfilingStatsView(generics.GenericAPIView):
+    """Per-endpoint request profiles from every process (REQUEST_PROFILING)."""
+    permission_classes = [IsAdminAuthenticated]
+    authentication_classes = [AdminSessionMiddleware]
+
+    def get(self, request, *args, **kwargs):
+        return Response({
+            'enabled': settings.REQUEST_PROFILING,
+            'endpoints': profiling.collect_stats(),
+        }, status=status.HTTP_200_OK)
+
+    def delete(self, request, *args, **kwargs):
+        profiling.reset_stats()
+        return Response({'details': 'Profiling stats reset.'}, status=status.HTTP_200_OK)
+
@@ -3,9 +3,11 @@ from ..serializers.customer import CustomerSerializer
 from panel.middleware import AdminSessionMiddleware
 from customer.models import  Customer
 from panel.permissions import IsAdminAuthenticated
+from core.pagination import CreatedAtCursorPagination
 
 class CustomerAdminListView(generics.ListAPIView):
     permission_classes = [IsAdminAuthenticated]
     authentication_classes = [AdminSessionMiddleware]
     serializer_class = CustomerSerializer
-    queryset = Customer.objects.all()
\ No newline at end of file
+    queryset = Customer.objects.all()
+    pagination_class = CreatedAtCursorPagination
\ No newline at end of file
@@ -15,10 +15,11 @@ from ..serializers.event import (
     EventVideoUpdateSerializer,
 )
 from services.models import EventVideo
-from services.filters.event import EventFilter
+from services.filters.event import EventFilter, EventSearchFilter
 from panel.permissions import IsAdminAuthenticated
 from panel.middleware import AdminSessionMiddleware
 from django.shortcuts import get_object_or_404
+from core.pagination import CreatedAtCursorPagination
 
 # ---------------- ADMIN EVENTS ----------------
 class AdminEventListView(generics.ListAPIView):
@@ -26,11 +27,11 @@ class AdminEventListView(generics.ListAPIView):
     serializer_class = EventListSerializer
     permission_classes = [IsAdminAuthenticated]
     authentication_classes = [AdminSessionMiddleware]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, EventSearchFilter, filters.OrderingFilter]
     filterset_class = EventFilter
-    search_fields = ['name', 'description']
     ordering_fields = ['created_at', 'base_price', 'bookings_count', 'views_count']
     ordering = ['-created_at']
+    pagination_class = CreatedAtCursorPagination
 
 class AdminEventDetailView(generics.RetrieveAPIView):
     queryset = Event.objects.select_related('category', 'city', 'company')
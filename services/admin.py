@@ -1,6 +1,6 @@
 from django.contrib import admin
 from services.models import (
-    Category, City, Event, EventImage, Discount, Country, CompanyCategory, Review,
+    Category, City, Event, EventImage, Discount, Country, CompanyCategory, Review, ImageBlob,
 )
 
 
@@ -18,3 +18,9 @@ class ReviewAdmin(admin.ModelAdmin):
     list_display = ('id', 'event', 'customer', 'rating', 'created_at')
     list_filter = ('rating',)
     search_fields = ('event__name', 'customer__email', 'comment')
+
+
+@admin.register(ImageBlob)
+class ImageBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'refcount', 'created_at')
+    search_fields = ('name', 'sha256', 'source_sha256')
@@ -1,9 +1,17 @@
 import django_filters
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 from ..models import Event
+from rest_framework.exceptions import ValidationError
+from ..search import search_events
+from ..geo import within_box, within_radius
 from services.models.category import Category
 from services.models.city import City
 
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 200
+
+
 class EventFilter(django_filters.FilterSet):
     min_price = django_filters.NumberFilter(field_name='base_price', lookup_expr='gte')
     max_price = django_filters.NumberFilter(field_name='base_price', lookup_expr='lte')
@@ -40,10 +48,11 @@ class EventFilter(django_filters.FilterSet):
     
     has_discount = django_filters.BooleanFilter(method='filter_has_discount')
     
-    # Custom filter for services within distance (if you have lat/lng)
-    # latitude = django_filters.NumberFilter(method='filter_by_distance')
-    # longitude = django_filters.NumberFilter(method='filter_by_distance')
-    # radius = django_filters.NumberFilter(method='filter_by_distance')
+    # Applied together in filter_queryset; see services.geo.
+    latitude = django_filters.NumberFilter(method='filter_geo', min_value=-90, max_value=90)
+    longitude = django_filters.NumberFilter(method='filter_geo', min_value=-180, max_value=180)
+    radius = django_filters.NumberFilter(method='filter_geo', min_value=0, max_value=MAX_RADIUS_KM)
+    bbox = django_filters.BaseCSVFilter(method='filter_geo', help_text='south,west,north,east')
     
     class Meta:
         model = Event
@@ -54,6 +63,29 @@ class EventFilter(django_filters.FilterSet):
             'bookings_count': ['gte', 'lte'],
         }
     
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        data = self.form.cleaned_data
+        bbox = data.get('bbox')
+        if bbox:
+            try:
+                south, west, north, east = (float(value) for value in bbox)
+            except ValueError:
+                raise ValidationError({'bbox': 'Expected south,west,north,east.'})
+            if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+                raise ValidationError({'bbox': 'Coordinates out of range.'})
+            queryset = within_box(queryset, south, west, north, east)
+        latitude, longitude = data.get('latitude'), data.get('longitude')
+        if latitude is not None and longitude is not None:
+            radius = data.get('radius')
+            if radius is None:
+                radius = DEFAULT_RADIUS_KM
+            queryset = within_radius(queryset, latitude, longitude, float(radius))
+        return queryset
+
+    def filter_geo(self, queryset, name, value):
+        return queryset
+
     def filter_has_discount(self, queryset, name, value):
         if value:
             from django.utils import timezone
@@ -63,4 +95,14 @@ class EventFilter(django_filters.FilterSet):
                 discounts__start_date__lte=now,
                 discounts__end_date__gte=now
             ).distinct()
-        return queryset
\ No newline at end of file
+        return queryset
+
+
+class EventSearchFilter(SearchFilter):
+    # `?search=` served from the translated FULLTEXT index instead of
+    # LIKE '%q%' over the default-language columns.
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        return search_events(queryset, query, rank=False)
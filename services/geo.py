@@ -0,0 +1,135 @@
+"""Geohash cells for Event.geohash and the "near me" / map queries.
+
+A radius or bounding box is first narrowed to the handful of geohash cells
+covering it, which turns into indexed `geohash LIKE 'abc%'` range scans.
+Only the rows in those cells are then checked against the exact box or
+haversine distance.
+"""
+import math
+from functools import reduce
+from operator import or_
+
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Upper bound on cells per query; more cells means tighter candidates but
+# more OR-ed range scans.
+MAX_CELLS = 16
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(height, width) of a cell in degrees."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def _cells_at(south, west, north, east, precision):
+    height, width = cell_size(precision)
+    rows = range(int((south + 90) // height), int((min(north, 90 - 1e-9) + 90) // height) + 1)
+    columns_per_world = round(360 / width)
+    first = int((west + 180) // width)
+    last = int((east + 180) // width)
+    if east < west:
+        # The box crosses the antimeridian.
+        last += columns_per_world
+    columns = [column % columns_per_world for column in range(first, last + 1)]
+    if len(rows) * len(set(columns)) > MAX_CELLS:
+        return None
+    return {
+        encode(-90 + (row + 0.5) * height, -180 + (column + 0.5) * width, precision)
+        for row in rows
+        for column in set(columns)
+    }
+
+
+def covering_cells(south, west, north, east):
+    """Smallest set of equally sized geohash prefixes covering the box,
+    or an empty set when the box is too large to be worth narrowing."""
+    cells = set()
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        found = _cells_at(south, west, north, east, precision)
+        if found is None:
+            break
+        cells = found
+    return cells
+
+
+def radius_box(latitude, longitude, radius_km):
+    """(south, west, north, east) around a point; spans every longitude
+    when the circle reaches a pole."""
+    latitude, longitude = float(latitude), float(longitude)
+    delta_lat = radius_km / KM_PER_DEGREE
+    south, north = latitude - delta_lat, latitude + delta_lat
+    if south <= -90 or north >= 90:
+        return max(south, -90.0), -180.0, min(north, 90.0), 180.0
+    delta_lng = min(delta_lat / math.cos(math.radians(latitude)), 180.0)
+    west = (longitude - delta_lng + 180) % 360 - 180
+    east = (longitude + delta_lng + 180) % 360 - 180
+    if delta_lng >= 180:
+        west, east = -180.0, 180.0
+    return south, west, north, east
+
+
+def _in_cells(cells):
+    if not cells:
+        return Q(geohash__isnull=False) & ~Q(geohash='')
+    return reduce(or_, (Q(geohash__startswith=cell) for cell in cells))
+
+
+def within_box(queryset, south, west, north, east):
+    if east >= west:
+        longitude = Q(longitude__gte=west, longitude__lte=east)
+    else:
+        longitude = Q(longitude__gte=west) | Q(longitude__lte=east)
+    return queryset.filter(
+        _in_cells(covering_cells(south, west, north, east)),
+        longitude,
+        latitude__gte=south,
+        latitude__lte=north,
+    )
+
+
+def distance_km(latitude, longitude):
+    """Haversine distance expression from a point to (latitude, longitude)."""
+    latitude, longitude = float(latitude), float(longitude)
+    half_lat = (Radians(F('latitude')) - math.radians(latitude)) / 2
+    half_lng = (Radians(F('longitude')) - math.radians(longitude)) / 2
+    a = Power(Sin(half_lat), 2) + math.cos(math.radians(latitude)) * Cos(Radians(F('latitude'))) * Power(Sin(half_lng), 2)
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a), output_field=FloatField())
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    """Events within `radius_km` of the point, annotated with `distance` (km)."""
+    return within_box(queryset, *radius_box(latitude, longitude, radius_km)).annotate(
+        distance=distance_km(latitude, longitude),
+    ).filter(distance__lte=radius_km)
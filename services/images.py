@@ -0,0 +1,376 @@
+"""Background WEBP transcoding and deduplication for uploaded images.
+
+Saving a model with a new upload first hashes it: if the same original was
+transcoded before, the row is pointed at the existing ImageBlob and is
+ready at once. Otherwise the file is stored as received and marked
+`pending`; once the transaction commits, it is handed to a pool of
+IMAGE_TRANSCODE_WORKERS worker processes (services/transcode.py), each
+capped at IMAGE_TRANSCODE_MEMORY_MB and IMAGE_MAX_PIXELS. When a worker
+finishes, the WEBP is moved to `<dir>/<sha256 of output>.webp`, the row is
+pointed at it and marked `ready` (or `failed`) with a conditional UPDATE,
+so a newer upload is never overwritten by an older job, and the raw
+upload is deleted.
+
+Every row referencing a blob holds one count of ImageBlob.refcount. Deleting
+a row, or replacing its upload, releases it; the last release deletes the
+file and its variants. Files from before deduplication have no blob and
+are deleted once no row references them.
+
+Jobs live in process memory; `manage.py transcode_images` picks up rows
+left `pending` by a restart. With IMAGE_TRANSCODE_WORKERS = 0 the
+transcode runs in the saving process right after commit.
+
+Responsive variants (VARIANT_WIDTHS plus a blurred placeholder) are made
+once a transcode finishes. Images that still lack them are picked up
+lazily: the first serializer to see one queues one job in the same pool,
+guarded by a cache lock, and renders without them until the
+`<field>_variants` JSON is filled in. Without a pool a serializer never
+makes them itself; `manage.py transcode_images --variants` does. Variant
+files sit next to the image as `<name>_<width>w.webp`.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+from core.cache import bump_catalog_version
+from .transcode import init_worker, make_variants, transcode_file
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+READY = 'ready'
+FAILED = 'failed'
+
+IMAGE_STATUS_CHOICES = [
+    (PENDING, 'Pending'),
+    (READY, 'Ready'),
+    (FAILED, 'Failed'),
+]
+
+DEFAULT_QUALITY = 75
+
+VARIANT_WIDTHS = (320, 640, 1280)
+# While held, nobody else queues variants for the same image; a failed
+# job is not retried before it expires.
+VARIANT_LOCK_TIMEOUT = 10 * 60
+
+# (model label, image field) of every transcoded image. Each model also
+# has `<field>_status` and `<field>_variants` columns.
+TARGETS = [
+    ('services.EventImage', 'image'),
+    ('services.Category', 'icon'),
+    ('panel.Slider', 'image'),
+]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def needs_transcode(file):
+    """True for a fresh upload, or a path assigned directly that isn't WEBP yet."""
+    if not file:
+        return False
+    return not file._committed or not file.name.lower().endswith('.webp')
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn, not fork: the web process has threads and open
+                # database connections a forked child must not inherit.
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.IMAGE_TRANSCODE_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_worker,
+                    initargs=(settings.IMAGE_TRANSCODE_MEMORY_MB,),
+                )
+    return _pool
+
+
+def _reset_pool(broken):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+
+
+def _blobs():
+    return apps.get_model('services', 'ImageBlob').objects
+
+
+def _tmp_name(source_name):
+    return os.path.join(os.path.dirname(source_name), f"{uuid.uuid4()}.webp.part")
+
+
+def _delete_files(name):
+    default_storage.delete(name)
+    for width in VARIANT_WIDTHS:
+        default_storage.delete(_variant_name(name, width))
+
+
+def _is_referenced(name):
+    return any(apps.get_model(label).objects.filter(**{field: name}).exists() for label, field in TARGETS)
+
+
+def _claim(source_sha256):
+    """Take a reference on the blob transcoded from this original, if any."""
+    for blob in _blobs().filter(source_sha256=source_sha256):
+        # refcount 0 means a release is about to delete it.
+        if _blobs().filter(pk=blob.pk, refcount__gt=0).update(refcount=F('refcount') + 1):
+            return blob
+    return None
+
+
+def _adopt(name, sha256, source_sha256):
+    blob, created = _blobs().get_or_create(
+        name=name, defaults={'sha256': sha256, 'source_sha256': source_sha256, 'refcount': 1},
+    )
+    if not created:
+        _blobs().filter(pk=blob.pk).update(refcount=F('refcount') + 1)
+
+
+def release(name):
+    """Drop one reference to `name`; the last one deletes the file and its variants."""
+    if not name:
+        return
+    if _blobs().filter(name=name, refcount__gt=0).update(refcount=F('refcount') - 1):
+        if not _blobs().filter(name=name, refcount=0).delete()[0]:
+            return
+    elif _blobs().filter(name=name).exists() or _is_referenced(name):
+        return
+    _delete_files(name)
+
+
+def _finish(label, pk, field, source_name, tmp_name, result, error):
+    """Point the row at the transcoded file, unless it has moved on since."""
+    model = apps.get_model(label)
+    current = model.objects.filter(pk=pk, **{field: source_name})
+    if error is not None:
+        logger.warning("Transcoding %s %s %s failed: %s", label, pk, source_name, error)
+        current.update(**{f'{field}_status': FAILED})
+        return 0
+
+    source_sha256, sha256 = result
+    name = os.path.join(os.path.dirname(source_name), f"{sha256}.webp")
+    # Identical output may already be there; the bytes are the same.
+    os.replace(default_storage.path(tmp_name), default_storage.path(name))
+    with transaction.atomic():
+        updated = current.update(**{field: name, f'{field}_status': READY, f'{field}_variants': {}})
+        if updated:
+            _adopt(name, sha256, source_sha256)
+    # The raw upload is no longer referenced either way; the output only
+    # if the row was deleted or re-uploaded meanwhile.
+    default_storage.delete(source_name)
+    if updated:
+        # .update() skips post_save; cached catalog pages still hold the old URL.
+        bump_catalog_version()
+        request_variants(name)
+    elif not _blobs().filter(name=name).exists():
+        default_storage.delete(name)
+    return updated
+
+
+def _dispatch(fn, args, on_done):
+    """Run `fn(*args)` in the pool (or inline) and call `on_done(result, error)`
+    back in this process."""
+    if not settings.IMAGE_TRANSCODE_WORKERS:
+        try:
+            result, error = fn(*args), None
+        except Exception as e:
+            result, error = None, e
+        try:
+            on_done(result, error)
+        except Exception:
+            logger.exception("Recording %s result failed.", fn.__name__)
+        return None
+
+    pool = _get_pool()
+
+    def done(future):
+        try:
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool):
+                _reset_pool(pool)
+            on_done(None if error else future.result(), error)
+        except Exception:
+            logger.exception("Recording %s result failed.", fn.__name__)
+        finally:
+            close_old_connections()
+
+    try:
+        future = pool.submit(fn, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed over its memory limit); start afresh.
+        _reset_pool(pool)
+        logger.exception("Image pool broken; %s%r dropped.", fn.__name__, args)
+        return None
+    future.add_done_callback(done)
+    return future
+
+
+def submit(label, pk, field, source_name, quality=DEFAULT_QUALITY):
+    """Queue one transcode; returns the future, or None when run inline.
+
+    If the pool is broken the row stays pending for transcode_images.
+    """
+    tmp_name = _tmp_name(source_name)
+    return _dispatch(
+        transcode_file,
+        (default_storage.path(source_name), default_storage.path(tmp_name),
+         quality, settings.IMAGE_MAX_PIXELS),
+        lambda result, error: _finish(label, pk, field, source_name, tmp_name, result, error),
+    )
+
+
+def _variant_name(source_name, width):
+    return f"{os.path.splitext(source_name)[0]}_{width}w.webp"
+
+
+def _variants_done(source_name, result, error):
+    if error is not None:
+        logger.warning("Variants for %s failed: %s", source_name, error)
+        return
+    widths, placeholder = result
+    variants = {
+        'source': source_name,
+        'srcset': {str(width): _variant_name(source_name, width) for width in widths},
+        'placeholder': placeholder,
+    }
+    # Every row sharing the file gets them. Cached catalog pages are not
+    # bumped for this: they render fine without variants and pick them up
+    # when they next expire.
+    updated = _blobs().filter(name=source_name).update(variants=variants)
+    for label, field in TARGETS:
+        updated += apps.get_model(label).objects.filter(**{field: source_name}).update(
+            **{f'{field}_variants': variants}
+        )
+    if not updated:
+        for name in variants['srcset'].values():
+            default_storage.delete(name)
+
+
+def request_variants(source_name, quality=DEFAULT_QUALITY):
+    """Queue variant generation unless another request already has."""
+    if not cache.add(f"image_variants:{source_name}", 1, timeout=VARIANT_LOCK_TIMEOUT):
+        return None
+    targets = [(width, default_storage.path(_variant_name(source_name, width))) for width in VARIANT_WIDTHS]
+    return _dispatch(
+        make_variants,
+        (default_storage.path(source_name), targets, quality, settings.IMAGE_MAX_PIXELS),
+        lambda result, error: _variants_done(source_name, result, error),
+    )
+
+
+def get_variants(instance, field):
+    """`instance.<field>_variants` if they match the current file, else None.
+
+    Missing variants of a ready image are queued on the way out when there
+    is a pool; they are never made inline in a request.
+    """
+    file = getattr(instance, field)
+    if not file or getattr(instance, f'{field}_status') != READY:
+        return None
+    variants = getattr(instance, f'{field}_variants') or {}
+    if variants.get('source') == file.name:
+        return variants
+    if settings.IMAGE_TRANSCODE_WORKERS:
+        request_variants(file.name)
+    return None
+
+
+def shutdown():
+    """Wait for queued transcodes and their row updates, then stop the pool."""
+    global _pool
+    while True:
+        with _pool_lock:
+            pool, _pool = _pool, None
+        if pool is None:
+            return
+        # A finished transcode may queue its variants in a new pool.
+        pool.shutdown(wait=True)
+
+
+def _hash_upload(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def prepare_upload(instance, field):
+    """Call before saving `instance`, in the same transaction as the save.
+    Reuses the blob of an identical earlier upload, or marks the new one
+    pending; returns what finish_upload needs. The reference taken on a
+    reused blob is rolled back with a failed save."""
+    file = getattr(instance, field)
+    if not needs_transcode(file):
+        return None
+    previous = None
+    if instance.pk:
+        previous = type(instance)._default_manager.filter(pk=instance.pk).values_list(field, flat=True).first()
+    # Paths assigned directly (not uploads) are transcoded without lookup.
+    blob = None if file._committed else _claim(_hash_upload(file))
+    if blob is not None:
+        setattr(instance, field, blob.name)
+        setattr(instance, f'{field}_status', READY)
+        setattr(instance, f'{field}_variants', blob.variants)
+    else:
+        setattr(instance, f'{field}_status', PENDING)
+    return {'previous': previous, 'transcode': blob is None}
+
+
+def finish_upload(instance, field, upload):
+    """Call after saving: queue the transcode and release the replaced file."""
+    if upload is None:
+        return
+    previous = upload['previous']
+    if previous:
+        transaction.on_commit(lambda: release(previous))
+    if upload['transcode']:
+        job = (instance._meta.label, instance.pk, field, getattr(instance, field).name)
+        transaction.on_commit(lambda: submit(*job))
+
+
+def image_deleted(sender, instance, **kwargs):
+    """post_delete receiver for every model in TARGETS."""
+    field = dict(TARGETS)[sender._meta.label]
+    name = getattr(instance, field).name
+    if name:
+        transaction.on_commit(lambda: release(name))
+
+
+def pending_jobs(include_failed=False, before=None):
+    """(label, pk, field, name) for rows still awaiting a transcode."""
+    statuses = [PENDING, FAILED] if include_failed else [PENDING]
+    for label, field in TARGETS:
+        queryset = apps.get_model(label).objects.filter(**{f'{field}_status__in': statuses})
+        if before is not None:
+            queryset = queryset.filter(created_at__lt=before)
+        for pk, name in queryset.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).values_list('pk', field):
+            yield label, pk, field, name
+
+
+def missing_variants():
+    """Names of ready images whose variants are missing or out of date."""
+    names = set()
+    for label, field in TARGETS:
+        queryset = apps.get_model(label).objects.filter(**{f'{field}_status': READY}).exclude(**{field: ''})
+        for name, variants in queryset.values_list(field, f'{field}_variants'):
+            if name and (variants or {}).get('source') != name:
+                names.add(name)
+    return sorted(names)
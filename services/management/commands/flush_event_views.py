@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from services.view_counts import flush_event_views
+
+
+class Command(BaseCommand):
+    help = "Write all buffered event detail views to Event.views_count now."
+
+    def handle(self, *args, **options):
+        written = flush_event_views(include_current=True)
+        self.stdout.write(self.style.SUCCESS(f"Flushed {written} buffered event views."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from services.models import EventRatingSummary
+
+
+class Command(BaseCommand):
+    help = "Recompute EventRatingSummary rows from the reviews table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", type=int, action="append", dest="events",
+                            help="Only rebuild this event (repeatable).")
+
+    def handle(self, *args, **options):
+        written = EventRatingSummary.rebuild(options["events"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} event rating summaries."))
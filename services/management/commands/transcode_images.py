@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from services import images
+
+
+class Command(BaseCommand):
+    help = "Transcode images left pending (e.g. by a restart) to WEBP, and optionally make missing variants."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help="Also retry images whose transcode failed.",
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=10,
+            help="Skip rows created in the last N minutes; they are likely still queued in a web process.",
+        )
+        parser.add_argument(
+            '--variants', action='store_true',
+            help="Also make the responsive variants of ready images that lack them.",
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(minutes=options['min_age'])
+        jobs = list(images.pending_jobs(include_failed=options['retry_failed'], before=before))
+        for label, pk, field, name in jobs:
+            images.submit(label, pk, field, name)
+        names = images.missing_variants() if options['variants'] else []
+        for name in names:
+            images.request_variants(name)
+        images.shutdown()
+        self.stdout.write(self.style.SUCCESS(f"Transcoded {len(jobs)} images."))
+        if options['variants']:
+            self.stdout.write(self.style.SUCCESS(f"Made variants for {len(names)} images."))
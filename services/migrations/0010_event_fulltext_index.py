@@ -0,0 +1,36 @@
+"""
+Adds the InnoDB FULLTEXT index used by services.search over every translated
+name/description column of services_event. MySQL only; other backends keep
+using the icontains fallback in services.search.
+"""
+from django.db import migrations
+
+LANGUAGES = ('en', 'ka', 'ru', 'hi', 'ar', 'he')
+COLUMNS = ', '.join(
+    f'`{field}_{lang}`' for field in ('name', 'description') for lang in LANGUAGES
+)
+
+
+def create_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        f'CREATE FULLTEXT INDEX `services_event_search` ON `services_event` ({COLUMNS})'
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute('DROP INDEX `services_event_search` ON `services_event`')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0009_alter_event_adult_price'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+from services.geo import encode
+
+
+def fill_geohash(apps, schema_editor):
+    Event = apps.get_model('services', 'Event')
+    events = Event.objects.filter(latitude__isnull=False, longitude__isnull=False).only('id', 'latitude', 'longitude')
+    batch = []
+    for event in events.iterator(chunk_size=1000):
+        event.geohash = encode(event.latitude, event.longitude)
+        batch.append(event)
+        if len(batch) >= 1000:
+            Event.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    Event.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0010_event_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=12),
+        ),
+        migrations.RunPython(fill_geohash, migrations.RunPython.noop),
+    ]
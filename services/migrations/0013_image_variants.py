@@ -0,0 +1,23 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0012_image_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='icon_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='eventimage',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:31
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+import django.db.models.deletion
+
+
+def fill_summaries(apps, schema_editor):
+    Review = apps.get_model('services', 'Review')
+    EventRatingSummary = apps.get_model('services', 'EventRatingSummary')
+    totals = Review.objects.values('event_id').annotate(
+        rating_count=Count('id'),
+        rating_sum=Sum('rating'),
+        good_count=Count('id', filter=Q(rating__gte=4)),
+        bad_count=Count('id', filter=Q(rating__lte=2)),
+        neutral_count=Count('id', filter=Q(rating=3)),
+        **{f'stars_{i}': Count('id', filter=Q(rating=i)) for i in range(1, 6)},
+    ).order_by()
+    EventRatingSummary.objects.bulk_create([EventRatingSummary(**row) for row in totals], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0014_image_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRatingSummary',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='services.event')),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('good_count', models.PositiveIntegerField(default=0)),
+                ('bad_count', models.PositiveIntegerField(default=0)),
+                ('neutral_count', models.PositiveIntegerField(default=0)),
+                ('stars_1', models.PositiveIntegerField(default=0)),
+                ('stars_2', models.PositiveIntegerField(default=0)),
+                ('stars_3', models.PositiveIntegerField(default=0)),
+                ('stars_4', models.PositiveIntegerField(default=0)),
+                ('stars_5', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Event rating summaries',
+            },
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0015_event_rating_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['event', 'created_at', 'id'], name='services_review_event_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['event', 'rating', 'created_at', 'id'], name='services_review_event_rating'),
+        ),
+    ]
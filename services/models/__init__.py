@@ -2,4 +2,5 @@ from .city import City
 from .event import Event, EventImage, EventVideo, Discount, EventAgePrice
 from .category import Category, CompanyCategory
 from .country import Country
-from .review import Review
+from .review import Review, EventRatingSummary
+from .image import ImageBlob
@@ -1,11 +1,19 @@
-from django.db import models
-from ..utils import image_upload, validate_image
-from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Count, Q
+from ..utils import image_upload
+from .. import images
 from staff.models import Company
 
 def upload_category_icon(instance, filename):
     return image_upload(instance, filename, 'category_icons/')
 
+class CategoryQuerySet(models.QuerySet):
+    def with_events_count(self):
+        return self.annotate(
+            active_events_count=Count('events', filter=Q(events__is_active=True)),
+        )
+
+
 class Category(models.Model):
     ACTIVITY_CHOICE = (
         ('water', 'Water activity'),
@@ -16,6 +24,8 @@ class Category(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     icon = models.ImageField(upload_to=upload_category_icon, null=True, blank=True)
+    icon_status = models.CharField(max_length=10, choices=images.IMAGE_STATUS_CHOICES, default=images.READY)
+    icon_variants = models.JSONField(default=dict, blank=True)
     is_active = models.BooleanField(default=True)
     color = models.CharField(max_length=50, blank=True, null=True)
     order = models.IntegerField(default=0)
@@ -23,13 +33,13 @@ class Category(models.Model):
     
     activity = models.CharField(max_length=25, choices=ACTIVITY_CHOICE)
 
+    objects = CategoryQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
-        if self.icon:
-            try:
-                self.icon = validate_image(image_field=self.icon, max_size_kb=1200, compress_quality=75, path='category_icons/')
-            except (FileNotFoundError, ValueError, ValidationError):
-                self.icon = None
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            upload = images.prepare_upload(self, 'icon')
+            super().save(*args, **kwargs)
+            images.finish_upload(self, 'icon', upload)
     
     class Meta:
         verbose_name_plural = "Categories"
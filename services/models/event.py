@@ -1,12 +1,14 @@
-from django.db import models
-from django.db.models import Value, FloatField, IntegerField
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When, FloatField, Count, Prefetch
+from django.db.models.functions import Cast, Coalesce
 from staff.models import Company
-from decimal import Decimal
 from django.core.validators import MinValueValidator, MaxValueValidator, FileExtensionValidator
 from services.models.category import Category
 from services.models.city import City
-from ..utils import image_upload, validate_image
-from django.core.exceptions import ValidationError
+from ..utils import image_upload
+from .. import images
+from ..geo import encode as encode_geohash
+from ..pricing import get_pricing_plan
 
 def upload_service_image(instance, filename):
     return image_upload(instance, filename, 'service_images/')
@@ -17,15 +19,59 @@ def upload_service_video(instance, filename):
 
 class EventQuerySet(models.QuerySet):
     def with_review_stats(self):
-        # Annotates constants instead of joining services_eventreview so the
-        # feed works without the reviews table existing.
+        # One LEFT JOIN on the per-event EventRatingSummary row instead of
+        # aggregating services_review for every event on the page.
+        count = F('rating_summary__rating_count')
         return self.annotate(
-            avg_rating=Value(None, output_field=FloatField(null=True)),
-            review_count=Value(0, output_field=IntegerField()),
-            good_count=Value(0, output_field=IntegerField()),
-            bad_count=Value(0, output_field=IntegerField()),
+            avg_rating=Case(
+                When(rating_summary__rating_count__gt=0,
+                     then=Cast(F('rating_summary__rating_sum'), FloatField()) / count),
+                default=Value(None),
+                output_field=FloatField(null=True),
+            ),
+            review_count=Coalesce(count, 0),
+            good_count=Coalesce(F('rating_summary__good_count'), 0),
+            bad_count=Coalesce(F('rating_summary__bad_count'), 0),
         )
 
+    def for_feed(self):
+        # Loads everything EventListSerializer reads (primary image, active
+        # discounts, related rows) up front so a feed page costs a constant
+        # number of queries instead of several per row.
+        return self.select_related('category', 'city', 'city__country', 'company').prefetch_related(
+            Prefetch(
+                'images',
+                queryset=EventImage.objects.filter(is_primary=True),
+                to_attr='primary_images',
+            ),
+            Prefetch(
+                'discounts',
+                queryset=Discount.objects.filter(is_active=True).order_by('pk'),
+                to_attr='active_discounts',
+            ),
+        )
+
+
+def attach_category_events_count(categories):
+    """Sets `active_events_count` on every category in one grouped query."""
+    pending = {}
+    for category in categories:
+        if getattr(category, 'active_events_count', None) is None:
+            pending.setdefault(category.pk, []).append(category)
+    if not pending:
+        return
+
+    counts = dict(
+        Event.objects.filter(category_id__in=pending.keys(), is_active=True)
+        .order_by()
+        .values('category_id')
+        .annotate(total=Count('id'))
+        .values_list('category_id', 'total')
+    )
+    for category_id, items in pending.items():
+        for category in items:
+            category.active_events_count = counts.get(category_id, 0)
+
 
 class Event(models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="events")
@@ -65,6 +111,7 @@ class Event(models.Model):
     location = models.CharField(max_length=300)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False, db_index=True)
 
     is_popular = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
@@ -107,111 +154,57 @@ class Event(models.Model):
     
     def __str__(self):
         return f"{self.id} | {self.name}"
+
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        self._pricing_plan = None
+        super().save(*args, **kwargs)
+
+    def get_primary_image(self):
+        if hasattr(self, 'primary_images'):
+            return self.primary_images[0] if self.primary_images else None
+        return self.images.filter(is_primary=True).first()
+
+    def get_active_discount(self):
+        """First active discount, or None when it is not currently valid."""
+        if hasattr(self, 'active_discounts'):
+            discount = self.active_discounts[0] if self.active_discounts else None
+        else:
+            discount = self.discounts.filter(is_active=True).first()
+        if discount and discount.is_valid():
+            return discount
+        return None
     
     def calculate_price(self, people_count=None, adults_count=0, children_count=0, infants_count=0, age_prices_data=None, event_date=None):
-        from datetime import datetime, time
-        
-        booking_time = None
-        if event_date:
-            if isinstance(event_date, str):
-                try:
-                    event_date = datetime.fromisoformat(event_date.replace('Z', '+00:00'))
-                except ValueError:
-                    pass
-            if hasattr(event_date, 'time'):
-                booking_time = event_date.time()
-            elif isinstance(event_date, time):
-                booking_time = event_date
-
-        def matches_time(ap):
-            if not ap.start_time or not ap.end_time:
-                return True
-            if booking_time is None:
-                return True
-            start = ap.start_time
-            end = ap.end_time
-            if start <= end:
-                return start <= booking_time <= end
-            return booking_time >= start or booking_time <= end
-
-        # 1. Custom dynamic age-based pricing (preferred)
-        if age_prices_data:
-            total_price = Decimal('0.00')
-            for item in age_prices_data:
-                ap_id = item.get('age_price_id')
-                qty = item.get('quantity', 0)
-                if qty > 0:
-                    try:
-                        ap = self.age_prices.get(id=ap_id)
-                        total_price += Decimal(str(ap.price)) * Decimal(str(qty))
-                    except EventAgePrice.DoesNotExist:
-                        pass
-            return total_price
-
-        # 2. If dynamic age prices exist, but only legacy counts were provided (fallback)
-        if self.age_prices.exists() and (adults_count > 0 or children_count > 0 or infants_count > 0):
-            total_price = Decimal('0.00')
-            matching_aps = list(self.age_prices.all())
-            if booking_time is not None:
-                matching_aps = [ap for ap in matching_aps if matches_time(ap)]
-            
-            sorted_aps = sorted(matching_aps, key=lambda x: (x.min_age, x.start_time or time.min))
-            
-            infant_ap = next((ap for ap in sorted_aps if ap.max_age <= 2), None)
-            child_ap = next((ap for ap in sorted_aps if 3 <= ap.min_age <= 12 or 3 <= ap.max_age <= 12), None)
-            other_aps = [ap for ap in sorted_aps if ap != infant_ap and ap != child_ap]
-            adult_ap = other_aps[-1] if other_aps else (sorted_aps[-1] if sorted_aps else None)
-            
-            if adult_ap and adults_count > 0:
-                total_price += Decimal(str(adult_ap.price)) * Decimal(str(adults_count))
-            if children_count > 0:
-                cap = child_ap or adult_ap
-                if cap:
-                    total_price += Decimal(str(cap.price)) * Decimal(str(children_count))
-            if infants_count > 0:
-                iap = infant_ap or child_ap or adult_ap
-                if iap:
-                    total_price += Decimal(str(iap.price)) * Decimal(str(infants_count))
-            return total_price
-
-        # 3. Legacy age-specific pricing
-        has_age_pricing = (self.child_price is not None) or (self.infant_price is not None)
-        
-        if has_age_pricing and (adults_count > 0 or children_count > 0 or infants_count > 0):
-            # Calculate pricing based on age categories:
-            adult_pr = self.adult_price if self.adult_price is not None else self.base_price
-            child_pr = self.child_price if self.child_price is not None else adult_pr
-            infant_pr = self.infant_price if self.infant_price is not None else adult_pr
-            
-            total_price = (Decimal(str(adults_count)) * Decimal(adult_pr)) + \
-                          (Decimal(str(children_count)) * Decimal(child_pr)) + \
-                          (Decimal(str(infants_count)) * Decimal(infant_pr))
-            return total_price
-        else:
-            # Fall back to standard pricing
-            if people_count is None:
-                people_count = adults_count + children_count + infants_count
-            if people_count < 1:
-                people_count = 1
-            total_price = self.base_price + (self.base_price * (people_count - 1))
-            return total_price
+        return get_pricing_plan(self).price(
+            people_count, adults_count, children_count, infants_count,
+            age_prices_data=age_prices_data, event_date=event_date,
+        )
     
 
 class EventImage(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to=upload_service_image)
+    # New uploads are stored as-is and transcoded to WEBP in the background
+    # (services/images.py); `image` points at the raw file until `ready`.
+    image_status = models.CharField(max_length=10, choices=images.IMAGE_STATUS_CHOICES, default=images.READY)
+    image_variants = models.JSONField(default=dict, blank=True)
     alt_text = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     order = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def save(self, *args, **kwargs):
-        if self.image:
-            try:
-                self.image = validate_image(image_field=self.image, max_size_kb=1200, compress_quality=75, path='service_images/')
-            except (FileNotFoundError, ValueError, ValidationError):
-                self.image = None
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            upload = images.prepare_upload(self, 'image')
+            super().save(*args, **kwargs)
+            images.finish_upload(self, 'image', upload)
     
     class Meta:
         ordering = ['order', 'created_at']
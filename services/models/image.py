@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class ImageBlob(models.Model):
+    """A transcoded image file, shared by every row whose upload produced it.
+
+    `name` is content-addressed (the SHA-256 of the WEBP); `source_sha256`
+    lets a later upload of the same original skip storing and transcoding.
+    The file and its variants are deleted when `refcount` drops to zero
+    (services/images.py).
+    """
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64)
+    source_sha256 = models.CharField(max_length=64, db_index=True)
+    refcount = models.PositiveIntegerField(default=0)
+    # Same shape as the `<field>_variants` columns, copied to rows on reuse.
+    variants = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
@@ -1,9 +1,13 @@
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum
 
 from customer.models import Customer
 from services.models.event import Event
 
+GOOD_RATING = 4  # and above
+BAD_RATING = 2  # and below
+
 
 class Review(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='reviews')
@@ -16,6 +20,100 @@ class Review(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pages of ReviewListView, unfiltered and by rating.
+            models.Index(fields=['event', 'created_at', 'id'], name='services_review_event_recent'),
+            models.Index(fields=['event', 'rating', 'created_at', 'id'], name='services_review_event_rating'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the rating summary currently counts for this review.
+        instance._counted = (instance.__dict__.get('event_id'), instance.__dict__.get('rating'))
+        return instance
 
     def __str__(self):
         return f"Review {self.id} | event={self.event_id} | {self.rating}*"
+
+
+def _rating_columns(rating):
+    columns = ['rating_count', f'stars_{rating}']
+    if rating >= GOOD_RATING:
+        columns.append('good_count')
+    elif rating <= BAD_RATING:
+        columns.append('bad_count')
+    else:
+        columns.append('neutral_count')
+    return columns
+
+
+class EventRatingSummary(models.Model):
+    """Review aggregates per event, kept current by the Review signals in
+    services/signals.py so listings read them with one join."""
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='rating_summary')
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    good_count = models.PositiveIntegerField(default=0)
+    bad_count = models.PositiveIntegerField(default=0)
+    neutral_count = models.PositiveIntegerField(default=0)
+    stars_1 = models.PositiveIntegerField(default=0)
+    stars_2 = models.PositiveIntegerField(default=0)
+    stars_3 = models.PositiveIntegerField(default=0)
+    stars_4 = models.PositiveIntegerField(default=0)
+    stars_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Event rating summaries"
+
+    def __str__(self):
+        return f"{self.event_id}: {self.rating_count} reviews"
+
+    @property
+    def average_rating(self):
+        return self.rating_sum / self.rating_count if self.rating_count else 0
+
+    def as_dict(self):
+        return {
+            'average_rating': round(self.average_rating, 2),
+            'rating_count': self.rating_count,
+            'good_count': self.good_count,
+            'bad_count': self.bad_count,
+            'neutral_count': self.neutral_count,
+            'distribution': {str(i): getattr(self, f'stars_{i}') for i in range(1, 6)},
+        }
+
+    @classmethod
+    def apply(cls, event_id, rating, sign):
+        """Add (sign=1) or remove (sign=-1) one review of `rating` stars."""
+        if sign > 0:
+            cls.objects.get_or_create(event_id=event_id)
+        # Removals never create a row: when an event is deleted its summary
+        # may already be gone by the time the cascaded reviews are.
+        changes = {column: F(column) + sign for column in _rating_columns(rating)}
+        changes['rating_sum'] = F('rating_sum') + sign * rating
+        cls.objects.filter(event_id=event_id).update(**changes)
+
+    @classmethod
+    def rebuild(cls, event_ids=None):
+        """Recompute summaries from the reviews; returns how many were written."""
+        reviews = Review.objects.all()
+        if event_ids is not None:
+            reviews = reviews.filter(event_id__in=event_ids)
+        totals = reviews.values('event_id').annotate(
+            rating_count=Count('id'),
+            rating_sum=Sum('rating'),
+            good_count=Count('id', filter=Q(rating__gte=GOOD_RATING)),
+            bad_count=Count('id', filter=Q(rating__lte=BAD_RATING)),
+            neutral_count=Count('id', filter=Q(rating__gt=BAD_RATING, rating__lt=GOOD_RATING)),
+            **{f'stars_{i}': Count('id', filter=Q(rating=i)) for i in range(1, 6)},
+        ).order_by()
+        summaries = [cls(**row) for row in totals]
+        with transaction.atomic():
+            stale = cls.objects.all()
+            if event_ids is not None:
+                stale = stale.filter(event_id__in=event_ids)
+            stale.delete()
+            cls.objects.bulk_create(summaries, batch_size=1000)
+        return len(summaries)
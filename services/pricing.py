@@ -0,0 +1,204 @@
+"""Compiled per-event pricing.
+
+PricingPlan holds everything Event.calculate_price needs: the age-price
+tiers sorted once, the infant/child/adult tier picked for every stretch of
+the day between time-window boundaries, and the legacy per-age prices. A
+plan is a plain picklable object, cached under the event's id and
+`updated_at`; saving an EventAgePrice touches its event's `updated_at`, so
+any pricing change moves the key and stale plans simply expire.
+"""
+import bisect
+from collections import namedtuple
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.core.cache import cache
+
+PLAN_CACHE_TIMEOUT = 24 * 60 * 60
+
+AgeTier = namedtuple('AgeTier', 'id category_name min_age max_age price start_time end_time')
+TierChoice = namedtuple('TierChoice', 'adult child infant')
+
+INFANT, CHILD, ADULT = 'infant', 'child', 'adult'
+
+
+def _matches_time(tier, booking_time):
+    if not tier.start_time or not tier.end_time:
+        return True
+    start, end = tier.start_time, tier.end_time
+    if start <= end:
+        return start <= booking_time <= end
+    return booking_time >= start or booking_time <= end
+
+
+def _choose(tiers):
+    infant = next((ap for ap in tiers if ap.max_age <= 2), None)
+    child = next((ap for ap in tiers if 3 <= ap.min_age <= 12 or 3 <= ap.max_age <= 12), None)
+    others = [ap for ap in tiers if ap != infant and ap != child]
+    adult = others[-1] if others else (tiers[-1] if tiers else None)
+    return TierChoice(adult, child, infant)
+
+
+def booking_time_of(event_date):
+    if not event_date:
+        return None
+    if isinstance(event_date, str):
+        try:
+            event_date = datetime.fromisoformat(event_date.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if isinstance(event_date, datetime):
+        return event_date.time()
+    if isinstance(event_date, time):
+        return event_date
+    return None
+
+
+class PricingPlan:
+    def __init__(self, event, age_prices):
+        self.base_price = event.base_price
+        self.adult_price = event.adult_price
+        self.child_price = event.child_price
+        self.infant_price = event.infant_price
+
+        self.tiers = sorted(
+            (AgeTier(ap.id, ap.category_name, ap.min_age, ap.max_age, ap.price, ap.start_time, ap.end_time)
+             for ap in age_prices),
+            key=lambda ap: (ap.min_age, ap.start_time or time.min),
+        )
+        self.tiers_by_id = {str(ap.id): ap for ap in self.tiers}
+        self.any_time = _choose(self.tiers)
+
+        # The tiers matching a booking time only change at window boundaries,
+        # so the choice is precomputed for each boundary (windows are
+        # inclusive) and for each open stretch between consecutive ones.
+        self.boundaries = sorted({
+            moment
+            for ap in self.tiers if ap.start_time and ap.end_time
+            for moment in (ap.start_time, ap.end_time)
+        })
+        self.at_boundary = []
+        self.between = []
+        for index, moment in enumerate(self.boundaries):
+            self.at_boundary.append(self._choose_at(moment))
+            self.between.append(self._choose_at(self._sample_before(index)))
+        if self.boundaries:
+            self.between.append(self._choose_at(self._sample_after(self.boundaries[-1])))
+
+    def _choose_at(self, moment):
+        return _choose([ap for ap in self.tiers if moment is None or _matches_time(ap, moment)])
+
+    def _sample_before(self, index):
+        # Any time strictly inside the stretch ending at boundaries[index];
+        # its microsecond value is irrelevant as long as it is in range.
+        upper = self.boundaries[index]
+        lower = self.boundaries[index - 1] if index else None
+        if lower is None:
+            return time.min if upper != time.min else None
+        return _midpoint(lower, upper)
+
+    def _sample_after(self, moment):
+        return time.max if moment != time.max else None
+
+    def tier_choice(self, booking_time):
+        if booking_time is None or not self.boundaries:
+            return self.any_time
+        index = bisect.bisect_left(self.boundaries, booking_time)
+        if index < len(self.boundaries) and self.boundaries[index] == booking_time:
+            return self.at_boundary[index]
+        return self.between[index]
+
+    def age_price(self, age_price_id):
+        return self.tiers_by_id.get(str(age_price_id))
+
+    def age_group(self, age_price_id):
+        ap = self.age_price(age_price_id)
+        if ap is None:
+            return None
+        if ap.max_age <= 2:
+            return INFANT
+        if ap.max_age <= 12:
+            return CHILD
+        return ADULT
+
+    def price(self, people_count=None, adults_count=0, children_count=0, infants_count=0, age_prices_data=None, event_date=None):
+        # 1. Custom dynamic age-based pricing (preferred)
+        if age_prices_data:
+            total_price = Decimal('0.00')
+            for item in age_prices_data:
+                qty = item.get('quantity', 0)
+                if qty > 0:
+                    ap = self.age_price(item.get('age_price_id'))
+                    if ap is not None:
+                        total_price += Decimal(str(ap.price)) * Decimal(str(qty))
+            return total_price
+
+        has_counts = adults_count > 0 or children_count > 0 or infants_count > 0
+
+        # 2. If dynamic age prices exist, but only legacy counts were provided (fallback)
+        if self.tiers and has_counts:
+            choice = self.tier_choice(booking_time_of(event_date))
+            total_price = Decimal('0.00')
+            if choice.adult and adults_count > 0:
+                total_price += Decimal(str(choice.adult.price)) * Decimal(str(adults_count))
+            if children_count > 0:
+                cap = choice.child or choice.adult
+                if cap:
+                    total_price += Decimal(str(cap.price)) * Decimal(str(children_count))
+            if infants_count > 0:
+                iap = choice.infant or choice.child or choice.adult
+                if iap:
+                    total_price += Decimal(str(iap.price)) * Decimal(str(infants_count))
+            return total_price
+
+        # 3. Legacy age-specific pricing
+        if (self.child_price is not None or self.infant_price is not None) and has_counts:
+            adult_pr = self.adult_price if self.adult_price is not None else self.base_price
+            child_pr = self.child_price if self.child_price is not None else adult_pr
+            infant_pr = self.infant_price if self.infant_price is not None else adult_pr
+            return (Decimal(str(adults_count)) * Decimal(adult_pr)) + \
+                   (Decimal(str(children_count)) * Decimal(child_pr)) + \
+                   (Decimal(str(infants_count)) * Decimal(infant_pr))
+
+        # Fall back to standard pricing
+        if people_count is None:
+            people_count = adults_count + children_count + infants_count
+        if people_count < 1:
+            people_count = 1
+        return self.base_price + (self.base_price * (people_count - 1))
+
+
+def _midpoint(lower, upper):
+    def micros(moment):
+        return ((moment.hour * 60 + moment.minute) * 60 + moment.second) * 1_000_000 + moment.microsecond
+    middle = (micros(lower) + micros(upper)) // 2
+    if middle == micros(lower):
+        # Adjacent microseconds: nothing lies strictly between them.
+        return None
+    seconds, microsecond = divmod(middle, 1_000_000)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return time(hour, minute, second, microsecond)
+
+
+def _plan_key(event):
+    stamp = event.updated_at.timestamp() if event.updated_at else 0
+    return f'pricing_plan:{event.pk}:{stamp}'
+
+
+def get_pricing_plan(event):
+    """The event's compiled plan: memoized on the instance, then looked up
+    in the cache, and only built (from prefetched age prices when present)
+    on a miss."""
+    plan = getattr(event, '_pricing_plan', None)
+    if plan is not None:
+        return plan
+    key = _plan_key(event) if event.pk else None
+    if key:
+        plan = cache.get(key)
+    if plan is None:
+        plan = PricingPlan(event, event.age_prices.all() if event.pk else [])
+        if key:
+            cache.set(key, plan, timeout=PLAN_CACHE_TIMEOUT)
+    event._pricing_plan = plan
+    return plan
@@ -0,0 +1,68 @@
+import re
+from functools import reduce
+from operator import and_, or_
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Func, Q, F
+
+# Every translated column modeltranslation adds for Event; covered by the
+# `services_event_search` FULLTEXT index (migration 0010).
+EVENT_SEARCH_FIELDS = [
+    f'{field}_{lang}'
+    for field in ('name', 'description')
+    for lang in settings.MODELTRANSLATION_LANGUAGES
+]
+EVENT_NAME_FIELDS = [f'name_{lang}' for lang in settings.MODELTRANSLATION_LANGUAGES]
+
+# InnoDB ignores words shorter than innodb_ft_min_token_size (3 by default).
+MIN_TOKEN_LENGTH = 3
+
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+
+class MatchAgainst(Func):
+    template = 'MATCH (%(expressions)s) AGAINST (%%s IN BOOLEAN MODE)'
+    output_field = FloatField()
+
+    def __init__(self, *expressions, query):
+        super().__init__(*expressions)
+        self.query = query
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = super().as_sql(compiler, connection, **extra_context)
+        return sql, (*params, self.query)
+
+
+def _tokens(query):
+    return _BOOLEAN_OPERATORS.sub(' ', query).split()
+
+
+def search_events(queryset, query, rank=True):
+    """Filter events matching every word of `query` in any language.
+
+    On MySQL this runs against the FULLTEXT index, matching each word as a
+    prefix, and orders by relevance when `rank` is set. Other backends, and
+    queries made only of words too short for the index, fall back to
+    icontains over the translated columns.
+    """
+    tokens = _tokens(query)
+    if not tokens:
+        return queryset.none()
+
+    indexed = [token for token in tokens if len(token) >= MIN_TOKEN_LENGTH]
+    if connection.vendor == 'mysql' and indexed:
+        boolean_query = ' '.join(f'+{token}*' for token in indexed)
+        queryset = queryset.annotate(
+            search_rank=MatchAgainst(*(F(field) for field in EVENT_SEARCH_FIELDS), query=boolean_query),
+        ).filter(search_rank__gt=0)
+        if rank:
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        return queryset
+
+    fields = EVENT_SEARCH_FIELDS if connection.vendor != 'mysql' else EVENT_NAME_FIELDS
+    condition = reduce(and_, (
+        reduce(or_, (Q(**{f'{field}__icontains': token}) for field in fields))
+        for token in tokens
+    ))
+    return queryset.filter(condition)
@@ -1,16 +1,21 @@
 from rest_framework import serializers
 from services.models import Category
+from .fields import ImageVariantsField
 
 class CategorySerializer(serializers.ModelSerializer):
     events_count = serializers.SerializerMethodField()
+    icon_variants = ImageVariantsField('icon')
     
     class Meta:
         model = Category
         fields = [
-            'id', 'name', 'color', 'activity', 'description', 'events_count', 'order', 'icon',
+            'id', 'name', 'color', 'activity', 'description', 'events_count', 'order', 'icon', 'icon_status', 'icon_variants',
             'name_en', 'name_ka', 'name_ru', 'name_hi', 'name_ar', 'name_he',
             'description_en', 'description_ka', 'description_ru', 'description_hi', 'description_ar', 'description_he'
         ]
     
     def get_events_count(self, obj):
-        return obj.events.filter(is_active=True).count()
+        count = getattr(obj, 'active_events_count', None)
+        if count is None:
+            count = obj.events.filter(is_active=True).count()
+        return count
@@ -1,13 +1,19 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from services.models import Event, EventImage, EventVideo, Discount, CompanyCategory, EventAgePrice
+from services.models.event import attach_category_events_count
+from services.pricing import get_pricing_plan, INFANT, CHILD
 from .category import CategorySerializer
 from .city import CitySerializer
+from .fields import ImageVariantsField
 from decimal import Decimal
 
 class EventImageSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = EventImage
-        fields = ['id', 'alt_text', 'image', 'is_primary', 'order']
+        fields = ['id', 'alt_text', 'image', 'image_status', 'image_variants', 'is_primary', 'order']
 
 class EventVideoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -30,6 +36,12 @@ class DiscountSerializer(serializers.ModelSerializer):
     def get_is_valid(self, obj):
         return obj.is_valid()
 
+class EventFeedListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        attach_category_events_count(item.category for item in items)
+        return super().to_representation(items)
+
 class EventListSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     city = CitySerializer(read_only=True)
@@ -54,23 +66,23 @@ class EventListSerializer(serializers.ModelSerializer):
             'name_en', 'name_ka', 'name_ru', 'name_hi', 'name_ar', 'name_he',
             'description_en', 'description_ka', 'description_ru', 'description_hi', 'description_ar', 'description_he'
         ]
+        list_serializer_class = EventFeedListSerializer
     
     def get_primary_image(self, obj):
-        primary_image = obj.images.filter(is_primary=True).first()
+        primary_image = obj.get_primary_image()
         if primary_image:
             return EventImageSerializer(primary_image).data
         return None
     
     def get_current_discount(self, obj):
-        active_discount = obj.discounts.filter(is_active=True).first()
-        if active_discount and active_discount.is_valid():
+        active_discount = obj.get_active_discount()
+        if active_discount:
             return DiscountSerializer(active_discount).data
         return None
     
     def get_discounted_price(self, obj):
-        discount = self.get_current_discount(obj)
-        if discount:
-            discount_obj = obj.discounts.filter(is_active=True).first()
+        discount_obj = obj.get_active_discount()
+        if discount_obj:
             if discount_obj.discount_type == 'percentage':
                 return obj.base_price * (1 - discount_obj.discount_value / 100)
             else:
@@ -102,6 +114,12 @@ class EventDetailSerializer(EventListSerializer):
     def get_videos(self, obj):
         # services_eventvideo table is not present on prod; skip the JOIN.
         return []
+
+class NearbyEventSerializer(EventListSerializer):
+    distance = serializers.FloatField(read_only=True)
+
+    class Meta(EventListSerializer.Meta):
+        fields = EventListSerializer.Meta.fields + ['distance']
     
 class ProviderStatsSerializer(serializers.Serializer):
     total_events = serializers.IntegerField()
@@ -150,71 +168,128 @@ class PriceCalculationSerializer(serializers.Serializer):
         return attrs
     
     def to_representation(self, instance):
-        event = instance['event']
-        age_prices_data = instance.get('age_prices')
-        event_date = instance.get('event_date')
-        
-        if age_prices_data:
-            people_count = 0
-            adults_count = 0
-            children_count = 0
-            infants_count = 0
-            for item in age_prices_data:
-                try:
-                    ap = event.age_prices.get(id=item.get('age_price_id'))
-                    qty = item.get('quantity', 0)
-                    people_count += qty
-                    if ap.max_age <= 2:
-                        infants_count += qty
-                    elif ap.max_age <= 12:
-                        children_count += qty
-                    else:
-                        adults_count += qty
-                except EventAgePrice.DoesNotExist:
-                    pass
-            base_price = event.calculate_price(age_prices_data=age_prices_data, event_date=event_date)
-        else:
-            adults_count = instance.get('adults_count', 0)
-            children_count = instance.get('children_count', 0)
-            infants_count = instance.get('infants_count', 0)
-            
-            if adults_count == 0 and children_count == 0 and infants_count == 0:
-                people_count = instance.get('people_count', 1)
-                adults_count = people_count
+        return build_price_quote(instance['event'], instance)
+
+
+def build_price_quote(event, instance):
+    """Prices one party composition against the event's compiled pricing
+    plan; the discount comes from the prefetch cache when it was loaded."""
+    age_prices_data = instance.get('age_prices')
+    event_date = instance.get('event_date')
+    
+    if age_prices_data:
+        plan = get_pricing_plan(event)
+        people_count = 0
+        adults_count = 0
+        children_count = 0
+        infants_count = 0
+        for item in age_prices_data:
+            group = plan.age_group(item.get('age_price_id'))
+            if group is None:
+                continue
+            qty = item.get('quantity', 0)
+            people_count += qty
+            if group == INFANT:
+                infants_count += qty
+            elif group == CHILD:
+                children_count += qty
             else:
-                people_count = adults_count + children_count + infants_count
-                
-            base_price = event.calculate_price(people_count, adults_count, children_count, infants_count, event_date=event_date)
-            
-        discount_amount = Decimal('0.00')
-        discount_info = None
+                adults_count += qty
+        base_price = event.calculate_price(age_prices_data=age_prices_data, event_date=event_date)
+    else:
+        adults_count = instance.get('adults_count', 0)
+        children_count = instance.get('children_count', 0)
+        infants_count = instance.get('infants_count', 0)
         
-        # Check for active discount
-        active_discount = event.discounts.filter(is_active=True).first()
-        if active_discount and active_discount.is_valid():
-            if active_discount.discount_type == 'percentage':
-                discount_amount = base_price * (active_discount.discount_value / 100)
-            else:
-                discount_amount = min(active_discount.discount_value, base_price)
+        if adults_count == 0 and children_count == 0 and infants_count == 0:
+            people_count = instance.get('people_count', 1)
+            adults_count = people_count
+        else:
+            people_count = adults_count + children_count + infants_count
             
-            discount_info = {
-                'name': active_discount.name,
-                'type': active_discount.discount_type,
-                'value': active_discount.discount_value,
-                'amount': discount_amount
-            }
+        base_price = event.calculate_price(people_count, adults_count, children_count, infants_count, event_date=event_date)
         
-        total_price = base_price - discount_amount
+    discount_amount = Decimal('0.00')
+    discount_info = None
+    
+    # Check for active discount
+    active_discount = event.get_active_discount()
+    if active_discount:
+        if active_discount.discount_type == 'percentage':
+            discount_amount = base_price * (active_discount.discount_value / 100)
+        else:
+            discount_amount = min(active_discount.discount_value, base_price)
         
-        return {
-            'event_id': event.id,
-            'event_name': event.name,
-            'people_count': people_count,
-            'adults_count': adults_count,
-            'children_count': children_count,
-            'infants_count': infants_count,
-            'base_price': base_price,
-            'discount': discount_info,
-            'discount_amount': discount_amount,
-            'total_price': total_price
-        }
\ No newline at end of file
+        discount_info = {
+            'name': active_discount.name,
+            'type': active_discount.discount_type,
+            'value': active_discount.discount_value,
+            'amount': discount_amount
+        }
+    
+    total_price = base_price - discount_amount
+    
+    return {
+        'event_id': event.id,
+        'event_name': event.name,
+        'people_count': people_count,
+        'adults_count': adults_count,
+        'children_count': children_count,
+        'infants_count': infants_count,
+        'base_price': base_price,
+        'discount': discount_info,
+        'discount_amount': discount_amount,
+        'total_price': total_price
+    }
+
+
+class PriceQuoteAgePriceSerializer(serializers.Serializer):
+    age_price_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0)
+
+
+class PriceQuoteItemSerializer(serializers.Serializer):
+    event_id = serializers.IntegerField()
+    people_count = serializers.IntegerField(required=False, min_value=1)
+    adults_count = serializers.IntegerField(required=False, min_value=0, default=0)
+    children_count = serializers.IntegerField(required=False, min_value=0, default=0)
+    infants_count = serializers.IntegerField(required=False, min_value=0, default=0)
+    event_date = serializers.DateTimeField(required=False, allow_null=True)
+    age_prices = PriceQuoteAgePriceSerializer(many=True, required=False, allow_empty=True)
+
+
+class BulkPriceQuoteSerializer(serializers.Serializer):
+    MAX_ITEMS = 100
+
+    items = PriceQuoteItemSerializer(many=True, allow_empty=False, max_length=MAX_ITEMS)
+
+    def validate(self, attrs):
+        event_ids = {item['event_id'] for item in attrs['items']}
+        # One query for the events plus one each for their age prices and
+        # active discounts, however many items are quoted.
+        attrs['events'] = Event.objects.filter(
+            id__in=event_ids,
+            is_active=True,
+            city__is_active=True,
+            city__country__is_active=True,
+            category__is_active=True
+        ).prefetch_related(
+            'age_prices',
+            Prefetch(
+                'discounts',
+                queryset=Discount.objects.filter(is_active=True).order_by('pk'),
+                to_attr='active_discounts',
+            ),
+        ).in_bulk()
+        return attrs
+
+    def to_representation(self, instance):
+        events = instance['events']
+        quotes = []
+        for item in instance['items']:
+            event = events.get(item['event_id'])
+            if event is None:
+                quotes.append({'event_id': item['event_id'], 'error': 'Event not found'})
+            else:
+                quotes.append(build_price_quote(event, item))
+        return quotes
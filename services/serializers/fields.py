@@ -0,0 +1,26 @@
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from services import images
+
+
+class ImageVariantsField(serializers.Field):
+    """Read-only `{'srcset': {width: url}, 'placeholder': data_uri}` for an
+    image field, or None until its variants have been generated."""
+
+    def __init__(self, image_field='image', **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.image_field = image_field
+
+    def to_representation(self, instance):
+        variants = images.get_variants(instance, self.image_field)
+        if variants is None:
+            return None
+        request = self.context.get('request')
+        srcset = {}
+        for width, name in variants['srcset'].items():
+            url = default_storage.url(name)
+            srcset[width] = request.build_absolute_uri(url) if request else url
+        return {'srcset': srcset, 'placeholder': variants['placeholder']}
@@ -0,0 +1,65 @@
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+
+from core.cache import bump_catalog_version, bump_version, reviews_version_key
+from . import images, suggest
+from .models import Category, City, Country, Event, EventAgePrice, EventImage, EventRatingSummary, Discount, Review
+
+# Counter bumps happen on nearly every request; letting them invalidate the
+# catalog would keep the popular/featured caches permanently cold.
+COUNTER_FIELDS = {'views_count', 'bookings_count', 'used_count'}
+
+
+def invalidate_catalog(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= COUNTER_FIELDS:
+        return
+    bump_catalog_version()
+
+
+for model in (Category, City, Country, Event, EventImage, Discount):
+    post_save.connect(invalidate_catalog, sender=model, dispatch_uid=f'catalog-save-{model.__name__}')
+    post_delete.connect(invalidate_catalog, sender=model, dispatch_uid=f'catalog-delete-{model.__name__}')
+
+post_save.connect(suggest.event_saved, sender=Event, dispatch_uid='suggest-save-Event')
+post_delete.connect(suggest.event_deleted, sender=Event, dispatch_uid='suggest-delete-Event')
+for model in (Category, City, Country):
+    post_save.connect(suggest.place_changed, sender=model, dispatch_uid=f'suggest-save-{model.__name__}')
+    post_delete.connect(suggest.place_changed, sender=model, dispatch_uid=f'suggest-delete-{model.__name__}')
+
+for label, field in images.TARGETS:
+    # Lazy "app.Model" senders: panel.Slider lives in another app.
+    post_delete.connect(images.image_deleted, sender=label, dispatch_uid=f'images-delete-{label}')
+
+
+def touch_event_pricing(sender, instance, **kwargs):
+    # Compiled pricing plans are keyed on Event.updated_at (services.pricing).
+    Event.objects.filter(pk=instance.event_id).update(updated_at=timezone.now())
+
+
+post_save.connect(touch_event_pricing, sender=EventAgePrice, dispatch_uid='pricing-save-EventAgePrice')
+post_delete.connect(touch_event_pricing, sender=EventAgePrice, dispatch_uid='pricing-delete-EventAgePrice')
+
+
+def review_saved(sender, instance, **kwargs):
+    counted = getattr(instance, '_counted', None)
+    current = (instance.event_id, instance.rating)
+    bump_version(reviews_version_key(instance.event_id))
+    if counted is not None and counted[0] != instance.event_id:
+        # Moved to another event: the old one's cached pages still list it.
+        bump_version(reviews_version_key(counted[0]))
+    if counted == current:
+        return
+    if counted is not None:
+        EventRatingSummary.apply(*counted, -1)
+    EventRatingSummary.apply(*current, 1)
+    instance._counted = current
+
+
+def review_deleted(sender, instance, **kwargs):
+    counted = getattr(instance, '_counted', None) or (instance.event_id, instance.rating)
+    bump_version(reviews_version_key(counted[0]))
+    EventRatingSummary.apply(*counted, -1)
+
+
+post_save.connect(review_saved, sender=Review, dispatch_uid='rating-summary-save-Review')
+post_delete.connect(review_deleted, sender=Review, dispatch_uid='rating-summary-delete-Review')
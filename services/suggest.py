@@ -0,0 +1,295 @@
+"""In-memory prefix index behind /api/v3/event/suggest.
+
+Every word suffix of every translated name of visible events, cities and
+categories is inserted into a trie whose nodes keep their best
+SUGGEST_MAX_RESULTS entries precomputed, so a lookup walks only the prefix
+and never touches the database.
+
+Event saves are applied to the trie incrementally by the process that made
+them. Each change also bumps a shared version key; other processes see it
+move and rebuild in a background thread, serving the old trie until then.
+City, category and country changes can hide or show whole groups of events,
+so they always trigger a background rebuild.
+"""
+import bisect
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from core.cache import bump_version, get_version
+from .models import Category, City, Event
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_VERSION_KEY = 'suggest:version'
+SUGGEST_MAX_RESULTS = 20
+# Local-memory caches do not share the version key between processes, so
+# every process also refreshes its trie at least this often.
+REBUILD_INTERVAL = 10 * 60
+
+LANGUAGES = settings.MODELTRANSLATION_LANGUAGES
+NAME_FIELDS = [f'name_{lang}' for lang in LANGUAGES]
+# Cities and categories are few and broad, so they rank above events.
+PLACE_WEIGHT = 10 ** 9
+
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    return ' '.join(_WORD.findall((text or '').casefold()))
+
+
+def _terms(names):
+    terms = set()
+    for name in names:
+        words = normalize(name).split()
+        for start in range(len(words)):
+            terms.add(' '.join(words[start:]))
+    return terms
+
+
+class _Node:
+    __slots__ = ('children', 'keys', 'top', 'truncated')
+
+    def __init__(self):
+        self.children = {}
+        self.keys = set()
+        self.top = []
+        self.truncated = False
+
+
+class SuggestionIndex:
+    def __init__(self):
+        self.root = _Node()
+        self.items = {}
+
+    def _rank(self, key):
+        return (-self.items[key]['weight'], key)
+
+    def _paths(self, terms):
+        for term in terms:
+            node = self.root
+            path = []
+            for char in term:
+                node = node.children.get(char)
+                if node is None:
+                    break
+                path.append(node)
+            yield path
+
+    def add(self, key, names, weight):
+        if key in self.items:
+            self.remove(key)
+        terms = _terms(names.values())
+        self.items[key] = {'names': names, 'weight': weight, 'terms': terms}
+        rank = self._rank(key)
+        for term in terms:
+            node = self.root
+            for char in term:
+                node = node.children.setdefault(char, _Node())
+                if rank in node.top:
+                    continue
+                bisect.insort(node.top, rank)
+                if len(node.top) > SUGGEST_MAX_RESULTS:
+                    node.top.pop()
+                    node.truncated = True
+            node.keys.add(key)
+
+    def removal(self, key):
+        """What removing `key` changes: the nodes listing it, and the new top
+        of each node it ranked in. Only reads the trie, so it can run while
+        lookups do; pass the result to apply_removal."""
+        item = self.items.get(key)
+        if item is None:
+            return None
+        rank = self._rank(key)
+        paths = list(self._paths(item['terms']))
+        tops = {}
+        for path in paths:
+            for node in path:
+                if id(node) in tops or rank not in node.top:
+                    continue
+                if node.truncated:
+                    # Refill from the subtree, without the key: it may
+                    # still be listed under one of its other terms.
+                    tops[id(node)] = (node, *self._collect(node, exclude=key))
+                else:
+                    tops[id(node)] = (node, [r for r in node.top if r != rank], False)
+        return [path[-1] for path in paths if path], list(tops.values())
+
+    def apply_removal(self, key, removal):
+        ends, tops = removal
+        for node in ends:
+            node.keys.discard(key)
+        for node, top, truncated in tops:
+            node.top = top
+            node.truncated = truncated
+        del self.items[key]
+
+    def remove(self, key):
+        removal = self.removal(key)
+        if removal is not None:
+            self.apply_removal(key, removal)
+
+    def _collect(self, node, exclude):
+        keys = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            keys.update(current.keys)
+            stack.extend(current.children.values())
+        keys.discard(exclude)
+        ranks = sorted(self._rank(key) for key in keys)
+        return ranks[:SUGGEST_MAX_RESULTS], len(ranks) > SUGGEST_MAX_RESULTS
+
+    def lookup(self, prefix, limit):
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [key for _, key in node.top[:limit]]
+
+
+def _visible_events():
+    return Event.objects.filter(
+        is_active=True,
+        city__is_active=True,
+        city__country__is_active=True,
+        category__is_active=True,
+    )
+
+
+def _event_row(row):
+    event_id, bookings_count, *names = row
+    return ('event', event_id), dict(zip(LANGUAGES, names)), bookings_count
+
+
+def build_index():
+    index = SuggestionIndex()
+    for row in _visible_events().values_list('id', 'bookings_count', *NAME_FIELDS):
+        index.add(*_event_row(row))
+    cities = City.objects.filter(is_active=True, country__is_active=True)
+    for city_id, *names in cities.values_list('id', *NAME_FIELDS):
+        index.add(('city', city_id), dict(zip(LANGUAGES, names)), PLACE_WEIGHT)
+    for category_id, *names in Category.objects.filter(is_active=True).values_list('id', *NAME_FIELDS):
+        index.add(('category', category_id), dict(zip(LANGUAGES, names)), PLACE_WEIGHT)
+    return index
+
+
+_lock = threading.RLock()
+# Serializes edits to the live trie. They read it without `_lock`, so that
+# walking a large subtree never blocks lookups, and hold `_lock` only to
+# apply the result.
+_edit_lock = threading.Lock()
+_index = None
+_index_version = None
+_built_at = 0.0
+_rebuilding = False
+
+
+def _install(index, version):
+    global _index, _index_version, _built_at
+    with _lock:
+        _index = index
+        _index_version = version
+        _built_at = time.time()
+
+
+def _rebuild_in_background():
+    global _rebuilding
+    try:
+        version = get_version(SUGGEST_VERSION_KEY)
+        _install(build_index(), version)
+    except Exception:
+        logger.exception('Rebuilding the suggestion index failed.')
+    finally:
+        _rebuilding = False
+        close_old_connections()
+
+
+def schedule_rebuild(**kwargs):
+    global _rebuilding
+    with _lock:
+        if _rebuilding or _index is None:
+            return
+        _rebuilding = True
+    threading.Thread(target=_rebuild_in_background, name='suggest-rebuild', daemon=True).start()
+
+
+def _current_index():
+    if _index is None:
+        with _lock:
+            if _index is None:
+                version = get_version(SUGGEST_VERSION_KEY)
+                _install(build_index(), version)
+    elif _index_version != get_version(SUGGEST_VERSION_KEY) or time.time() - _built_at > REBUILD_INTERVAL:
+        schedule_rebuild()
+    return _index
+
+
+def suggest(prefix, lang, limit):
+    prefix = normalize(prefix)
+    if not prefix:
+        return []
+    index = _current_index()
+    with _lock:
+        keys = index.lookup(prefix, limit)
+        items = [(key, index.items[key]['names']) for key in keys]
+    return [
+        {'type': kind, 'id': pk, 'name': names.get(lang) or names.get('en') or ''}
+        for (kind, pk), names in items
+    ]
+
+
+def _changed(**kwargs):
+    """Bump the shared version and keep this process's trie current with it."""
+    global _index_version
+    version = bump_version(SUGGEST_VERSION_KEY)
+    with _lock:
+        if _index is None or _index_version is None:
+            return
+        if _index_version == version - 1:
+            _index_version = version
+            return
+    # Another process changed something since this trie was built.
+    schedule_rebuild()
+
+
+def _edit(key, row=None):
+    """Remove `key` from the live trie, then add `row` for it if given."""
+    with _edit_lock:
+        index = _index
+        if index is None:
+            return
+        removal = index.removal(key)
+        with _lock:
+            if removal is not None:
+                index.apply_removal(key, removal)
+            if row is not None:
+                index.add(*_event_row(row))
+
+
+def event_saved(sender, instance, update_fields=None, **kwargs):
+    # Popularity drift from counter bumps is picked up by the periodic
+    # rebuild; reacting to each one would make every process rebuild.
+    if update_fields and set(update_fields) <= {'views_count', 'bookings_count'}:
+        return
+    if _index is not None:
+        row = _visible_events().filter(pk=instance.pk).values_list('id', 'bookings_count', *NAME_FIELDS).first()
+        _edit(('event', instance.pk), row)
+    _changed()
+
+
+def event_deleted(sender, instance, **kwargs):
+    _edit(('event', instance.pk))
+    _changed()
+
+
+def place_changed(sender, **kwargs):
+    bump_version(SUGGEST_VERSION_KEY)
+    schedule_rebuild()
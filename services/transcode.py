@@ -0,0 +1,111 @@
+"""WEBP transcoding and resizing, run inside the image worker processes.
+
+Kept free of Django imports: the pool spawns fresh interpreters, which only
+import this module to run `transcode_file` and `make_variants`.
+"""
+import base64
+import hashlib
+import math
+import os
+from io import BytesIO
+
+from PIL import Image, ImageFilter
+
+# Largest width or height a WEBP file can hold.
+WEBP_MAX_DIMENSION = 16383
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 30
+
+
+def init_worker(memory_limit_mb):
+    # Pixel counts are checked in open_within_budget, which can still
+    # shrink large JPEGs at decode time; Pillow's own bomb check would
+    # refuse them before that.
+    Image.MAX_IMAGE_PIXELS = None
+    if memory_limit_mb:
+        try:
+            import resource
+        except ImportError:
+            return
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def open_within_budget(path, max_pixels):
+    """Open `path`, decoding at most `max_pixels` pixels.
+
+    Formats that support draft mode (JPEG) are decoded at 1/2, 1/4 or 1/8
+    scale when the full image is over budget; anything else over budget
+    is refused.
+    """
+    img = Image.open(path)
+    width, height = img.size
+    if max_pixels and width * height > max_pixels:
+        # draft() picks the strongest reduction still at least as large as
+        # the requested size, so asking for half the budget scale lands
+        # between half and the full budget scale.
+        scale = math.sqrt(max_pixels / (width * height)) / 2
+        img.draft('RGB', (max(1, int(width * scale)), max(1, int(height * scale))))
+        if img.size[0] * img.size[1] > max_pixels:
+            img.close()
+            raise ValueError(f"Image is {width}x{height}, over the {max_pixels} pixel budget.")
+    return img
+
+
+def save_webp(img, dest_path, quality):
+    # Written aside and renamed so a half-written file is never served.
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        img.save(tmp_path, format='WEBP', quality=quality, optimize=True)
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def transcode_file(source_path, dest_path, quality, max_pixels):
+    """Write `source_path` to `dest_path` as WEBP; returns the SHA-256 of
+    the source and of the output."""
+    with open_within_budget(source_path, max_pixels) as img:
+        rgb = img.convert('RGB')
+    if max(rgb.size) > WEBP_MAX_DIMENSION:
+        rgb.thumbnail((WEBP_MAX_DIMENSION, WEBP_MAX_DIMENSION))
+    save_webp(rgb, dest_path, quality)
+    return file_sha256(source_path), file_sha256(dest_path)
+
+
+def _scaled(img, width, resample):
+    height = max(1, round(img.height * width / img.width))
+    return img.resize((width, height), resample)
+
+
+def make_variants(source_path, targets, quality, max_pixels):
+    """Write a narrower WEBP copy of `source_path` for each (width, dest_path)
+    in `targets`, skipping widths the source doesn't exceed.
+
+    Returns the widths written and a tiny blurred placeholder as a data URI.
+    Each variant is scaled down from the previous one, widest first.
+    """
+    with open_within_budget(source_path, max_pixels) as img:
+        current = img.convert('RGB')
+    written = []
+    for width, dest_path in sorted(targets, reverse=True):
+        if width >= current.width:
+            continue
+        current = _scaled(current, width, Image.LANCZOS)
+        save_webp(current, dest_path, quality)
+        written.append(width)
+
+    placeholder = _scaled(current, min(PLACEHOLDER_WIDTH, current.width), Image.BILINEAR)
+    placeholder = placeholder.filter(ImageFilter.GaussianBlur(1))
+    buffer = BytesIO()
+    placeholder.save(buffer, format='WEBP', quality=PLACEHOLDER_QUALITY)
+    return sorted(written), "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
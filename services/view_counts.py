@@ -0,0 +1,125 @@
+"""Write-behind buffer for Event.views_count.
+
+Detail views only touch the cache: views are counted per event in time
+buckets of EVENT_VIEWS_FLUSH_INTERVAL seconds with atomic add/incr, and a
+daemon thread per process turns every closed bucket into one
+`F('views_count') + n` UPDATE per event. Buffered views reach the database
+within about three intervals, which bounds what a cache loss can drop.
+The `flush_event_views` command drains everything immediately; with the
+local-memory backend it only sees its own process, so use a shared cache
+when running it from cron.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from core.background import PeriodicJob
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'event_views'
+FLUSHED_KEY = f'{KEY_PREFIX}:flushed'
+LOCK_KEY = f'{KEY_PREFIX}:lock'
+LOCK_TIMEOUT = 60
+BUFFER_TTL = 24 * 60 * 60
+
+
+def _bucket(now=None):
+    return int((now or time.time()) // settings.EVENT_VIEWS_FLUSH_INTERVAL)
+
+
+def record_event_view(event_id):
+    bucket = _bucket()
+    key = f'{KEY_PREFIX}:{bucket}:{event_id}'
+    if cache.add(key, 1, timeout=BUFFER_TTL):
+        # First view of this event in the bucket: register it so the flush
+        # can find the counter without scanning every event.
+        size_key = f'{KEY_PREFIX}:{bucket}:n'
+        if cache.add(size_key, 1, timeout=BUFFER_TTL):
+            slot = 1
+        else:
+            slot = cache.incr(size_key)
+        cache.set(f'{KEY_PREFIX}:{bucket}:id:{slot}', event_id, timeout=BUFFER_TTL)
+    else:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr(); the view is dropped.
+            pass
+    _flusher.ensure_started()
+
+
+def _drain_bucket(bucket, close):
+    size_key = f'{KEY_PREFIX}:{bucket}:n'
+    size = cache.get(size_key) or 0
+    if not size:
+        return 0
+    id_keys = [f'{KEY_PREFIX}:{bucket}:id:{slot}' for slot in range(1, size + 1)]
+    count_keys = {
+        f'{KEY_PREFIX}:{bucket}:{event_id}': event_id
+        for event_id in cache.get_many(id_keys).values()
+    }
+    counts = cache.get_many(list(count_keys))
+
+    written = 0
+    with transaction.atomic():
+        for key, views in counts.items():
+            if not views:
+                continue
+            Event.objects.filter(pk=count_keys[key]).update(views_count=F('views_count') + views)
+            written += views
+            if not close:
+                # The bucket is still live: subtract what was written rather
+                # than deleting, so views that landed meanwhile are kept.
+                cache.decr(key, views)
+
+    if close:
+        cache.delete_many([size_key, *id_keys, *count_keys])
+    return written
+
+
+def flush_event_views(include_current=False):
+    """Write buffered views to the database and return how many were written.
+
+    Only buckets that can no longer receive views are flushed and dropped,
+    unless `include_current` is set, in which case the live buckets are
+    drained as well.
+    """
+    if not cache.add(LOCK_KEY, 1, timeout=LOCK_TIMEOUT):
+        return 0
+    try:
+        current = _bucket()
+        # A request that read the clock just before a boundary may still be
+        # writing into the previous bucket, so it stays open one more interval.
+        last_closed = current - 2
+        flushed = cache.get(FLUSHED_KEY)
+        if flushed is None:
+            flushed = current - BUFFER_TTL // settings.EVENT_VIEWS_FLUSH_INTERVAL
+
+        written = 0
+        for bucket in range(flushed + 1, last_closed + 1):
+            written += _drain_bucket(bucket, close=True)
+        cache.set(FLUSHED_KEY, max(flushed, last_closed), timeout=None)
+
+        if include_current:
+            for bucket in (current - 1, current):
+                written += _drain_bucket(bucket, close=False)
+        return written
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def _flush_on_exit():
+    try:
+        flush_event_views(include_current=True)
+    except Exception:
+        logger.exception('Flushing buffered event views at exit failed.')
+
+
+_flusher = PeriodicJob('event-views-flusher', flush_event_views, 'EVENT_VIEWS_FLUSH_INTERVAL',
+                      at_exit=_flush_on_exit)
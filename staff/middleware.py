@@ -1,8 +1,16 @@
 from django.utils import timezone
+from core.sessions import SessionResolver
 from .models import StaffSession, CompanyStaff
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.authentication import BaseAuthentication
 
+
+def _company_ids(staff):
+    return list(CompanyStaff.objects.filter(staff=staff).values_list('company_id', flat=True))
+
+
+staff_sessions = SessionResolver('staff', StaffSession, 'staff', extra=_company_ids)
+
 class StaffSessionMiddleware(BaseAuthentication):
     def authenticate(self, request):
         session_token = request.COOKIES.get('staff_session_token')
@@ -10,18 +18,18 @@ class StaffSessionMiddleware(BaseAuthentication):
         if not session_token:
             return None
 
-        try:
-            session = StaffSession.objects.get(session_token=session_token)
-        except StaffSession.DoesNotExist:
+        session = staff_sessions.resolve(session_token)
+        if session is None:
             raise AuthenticationFailed('Invalid session token')
 
         if session.expires_at <= timezone.now():
             session.delete()
             raise AuthenticationFailed('Session expired')
 
-        if not CompanyStaff.objects.filter(staff=session.staff).exists():
+        if not session.auth_extra:
             session.delete()
             raise AuthenticationFailed("Please contact admin, staff does not belong to any company")
 
         request.staff = session.staff
+        request.staff_company_ids = session.auth_extra
         return (session.staff, session)
\ No newline at end of file
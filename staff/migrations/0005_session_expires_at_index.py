@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('staff', '0004_remove_company_identify_number_alter_staff_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='staffsession',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -7,7 +7,7 @@ class StaffSession(models.Model):
     ip = models.GenericIPAddressField(null=True, blank=True)
     session_token = models.CharField(max_length=255, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
 
     def is_valid(self):
         return self.expires_at > timezone.now()
@@ -1,13 +1,15 @@
 from rest_framework import serializers
 from services.models import Category
+from services.serializers.fields import ImageVariantsField
 
 class CategorySerializer(serializers.ModelSerializer):
     events_count = serializers.SerializerMethodField()
+    icon_variants = ImageVariantsField('icon')
     
     class Meta:
         model = Category
         fields = [
-            'id', 'name', 'activity', 'color', 'description', 'events_count', 'order', 'icon',
+            'id', 'name', 'activity', 'color', 'description', 'events_count', 'order', 'icon', 'icon_status', 'icon_variants',
             'name_en', 'name_ka', 'name_ru', 'name_hi', 'name_ar', 'name_he',
             'description_en', 'description_ka', 'description_ru', 'description_hi', 'description_ar', 'description_he'
         ]
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from services.models import Event, EventImage, EventVideo, Discount, CompanyCategory, EventAgePrice
 from services.serializers.event import EventVideoSerializer, EventAgePriceSerializer
+from services.serializers.fields import ImageVariantsField
 from .category import CategorySerializer
 from ..models.staff import Company, CompanyStaff
 from .city import CitySerializer
@@ -8,9 +9,11 @@ from decimal import Decimal
 from django.shortcuts import get_object_or_404
 
 class EventImageSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = EventImage
-        fields = ['id', 'alt_text', 'image', 'is_primary', 'order']
+        fields = ['id', 'alt_text', 'image', 'image_status', 'image_variants', 'is_primary', 'order']
 
 class DiscountSerializer(serializers.ModelSerializer):
     is_valid = serializers.SerializerMethodField()
@@ -266,7 +269,8 @@ class EventImageUploadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = EventImage
-        fields = ['id', 'image', 'alt_text', 'is_primary', 'order']
+        fields = ['id', 'image', 'image_status', 'alt_text', 'is_primary', 'order']
+        read_only_fields = ['image_status']
 
     def create(self, validated_data):
         event = self.context['event']
@@ -278,7 +282,8 @@ class EventImageUpdateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = EventImage
-        fields = ['id', 'image', 'alt_text', 'is_primary', 'order']
+        fields = ['id', 'image', 'image_status', 'alt_text', 'is_primary', 'order']
+        read_only_fields = ['image_status']
 
 
 class EventVideoUploadSerializer(serializers.ModelSerializer):
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save, post_delete
+
+from .middleware import staff_sessions
+from .models import CompanyStaff
+
+
+def forget_staff_companies(sender, instance, **kwargs):
+    # Cached staff principals carry their company ids (staff.middleware).
+    staff_sessions.forget_principal(instance.staff_id)
+
+
+staff_sessions.connect()
+post_save.connect(forget_staff_companies, sender=CompanyStaff, dispatch_uid='auth-staff-company-save')
+post_delete.connect(forget_staff_companies, sender=CompanyStaff, dispatch_uid='auth-staff-company-delete')
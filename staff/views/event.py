@@ -18,6 +18,7 @@ from ..middleware import StaffSessionMiddleware
 from orders.models import Order
 from orders.serializers.order import OrderSerializer
 from django.shortcuts import get_object_or_404
+from core.pagination import CreatedAtCursorPagination
 
 class CompanyEventCreateView(APIView):
     permission_classes = [IsStaffAuthenticated]
@@ -121,8 +122,10 @@ class CompanyOrderListView(APIView):
             return Response({"detail": "You do not belong to this company"}, status=403)
 
         orders = Order.objects.filter(event__company_id=company_id)
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+        paginator = CreatedAtCursorPagination()
+        page = paginator.paginate_queryset(orders, request, view=self)
+        serializer = OrderSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 class CompanyEventImageUploadView(APIView):
     permission_classes = [IsStaffAuthenticated]
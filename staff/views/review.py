@@ -1,8 +1,10 @@
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from services.models import Event, EventRatingSummary
 from ..middleware import StaffSessionMiddleware
 from ..permissions import IsStaffAuthenticated
 
@@ -53,7 +55,13 @@ class EventReviewSummaryForStaffView(APIView):
     authentication_classes = [StaffSessionMiddleware]
 
     def get(self, request, event_id):
-        return Response(_EMPTY_SUMMARY)
+        event = get_object_or_404(Event.objects.select_related('rating_summary'), id=event_id)
+        if event.company_id not in request.staff_company_ids:
+            return Response({"detail": "You do not belong to this company"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            return Response(event.rating_summary.as_dict())
+        except EventRatingSummary.DoesNotExist:
+            return Response(_EMPTY_SUMMARY)
 
 
 class ReviewModerationView(APIView):